@@ -0,0 +1,62 @@
+"""Benchmark ISO-8601 datetime parsing against the strptime path.
+
+Run with ``python -m benchmarks.bench_datetime [COUNT]``.
+"""
+import sys
+
+from sonarr import models
+
+from .common import best_of, load_fixture, scale
+
+KEYS = ("airDateUtc", "added", "firstAired", "lastInfoSync")
+
+
+def collect(data, values):
+    """Collect the datetime strings Sonarr returns for the given payload."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key in KEYS and isinstance(value, str):
+                values.append(value)
+            else:
+                collect(value, values)
+    elif isinstance(data, list):
+        for value in data:
+            collect(value, values)
+
+    return values
+
+
+def main(count: int = 100000) -> None:
+    """Run the benchmark."""
+    values = []
+    for fixture in ("calendar.json", "series.json", "wanted-missing.json"):
+        collect(load_fixture(fixture), values)
+
+    values = scale(values, count)
+
+    def run_strptime():
+        for value in values:
+            models._dt_str_to_dt_strptime(value)
+
+    def run_fast():
+        for value in values:
+            models._dt_str_to_dt_fast(value)
+
+    def run_cached():
+        models.dt_str_to_dt.cache_clear()
+        for value in values:
+            models.dt_str_to_dt(value)
+
+    baseline = best_of(run_strptime)
+    print(f"{count} timestamps")
+    print(f"strptime:          {baseline * 1000:8.2f} ms")
+
+    for name, func in (("fromisoformat:", run_fast), ("memoized:", run_cached)):
+        elapsed = best_of(func)
+        print(
+            f"{name:18} {elapsed * 1000:8.2f} ms ({baseline / elapsed:.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""Benchmark JSON decoding backends on scaled fixture payloads.
+
+Run with ``python -m benchmarks.bench_json [COUNT]``.
+"""
+import json
+import sys
+
+from sonarr.client import orjson
+
+from .common import best_of, load_fixture, scale
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def main(count: int = 5000) -> None:
+    """Run the benchmark."""
+    payloads = {
+        "calendar": json.dumps(scale(load_fixture("calendar.json"), count)),
+        "queue": json.dumps(scale(load_fixture("queue.json"), count)),
+        "series": json.dumps(scale(load_fixture("series.json"), count)),
+    }
+
+    backends = {
+        "json (str)": lambda body: json.loads(body.decode("utf8")),
+        "json (bytes)": json.loads,
+    }
+    if orjson is not None:
+        backends["orjson"] = orjson.loads
+    if ujson is not None:
+        backends["ujson"] = ujson.loads
+
+    for name, payload in payloads.items():
+        body = payload.encode("utf8")
+        print(f"{name}: {count} records, {len(body) / 1024 / 1024:.1f} MiB")
+
+        baseline = None
+        for backend, loads in backends.items():
+            elapsed = best_of(lambda: loads(body))
+            baseline = baseline or elapsed
+            print(
+                f"  {backend:14} {elapsed * 1000:8.2f} ms "
+                f"({baseline / elapsed:.1f}x faster)"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,70 @@
+"""Benchmark memory used per model object, with and without __slots__.
+
+Run with ``python -m benchmarks.bench_memory [COUNT]``.
+"""
+import sys
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+
+from sonarr import models
+
+from .common import load_fixture, scale
+
+
+def unslotted(cls: type) -> type:
+    """Return an equivalent frozen dataclass that keeps a per-instance __dict__."""
+    return make_dataclass(
+        cls.__name__,
+        [
+            (f.name, f.type, field(default=f.default))
+            if f.default is not MISSING
+            else (f.name, f.type)
+            for f in fields(cls)
+        ],
+        frozen=True,
+    )
+
+
+def bytes_per_object(cls: type, objects: list) -> float:
+    """Return the memory allocated per instance of cls built from objects."""
+    values = [{f.name: getattr(obj, f.name) for f in fields(obj)} for obj in objects]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [cls(**kwargs) for kwargs in values]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Exclude the list holding the instances.
+    return (after - before - sys.getsizeof(instances)) / len(instances)
+
+
+def main(count: int = 10000) -> None:
+    """Run the benchmark."""
+    calendar = scale(load_fixture("calendar.json"), count)
+    commands = scale(load_fixture("command.json"), count)
+    diskspace = scale(load_fixture("diskspace.json"), count)
+    queue = scale(load_fixture("queue.json"), count)
+    series = scale(load_fixture("series.json"), count)
+
+    samples = {
+        models.Disk: [models.Disk.from_dict(disk) for disk in diskspace],
+        models.CommandItem: [models.CommandItem.from_dict(cmd) for cmd in commands],
+        models.Episode: [models.Episode.from_dict(ep) for ep in calendar],
+        models.QueueItem: [models.QueueItem.from_dict(item) for item in queue],
+        models.Series: [models.Series.from_dict(item) for item in series],
+        models.SeriesItem: [models.SeriesItem.from_dict(item) for item in series],
+    }
+    samples[models.Season] = [
+        season for item in samples[models.SeriesItem] for season in item.seasons
+    ][:count]
+
+    print(f"{'model':12} {'__dict__':>10} {'__slots__':>10}   (bytes per object)")
+    for cls, objects in samples.items():
+        before = bytes_per_object(unslotted(cls), objects)
+        after = bytes_per_object(cls, objects)
+        print(f"{cls.__name__:12} {before:10.1f} {after:10.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
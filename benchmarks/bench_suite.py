@@ -0,0 +1,273 @@
+"""Benchmark suite for model parsing and client throughput.
+
+Each fixture is scaled to every size with the synthetic data generator and
+measured for:
+
+* parse: seconds to build the models of a decoded response
+* memory: bytes allocated per record by the built models
+* latency: seconds for the Sonarr method against a local mock server
+
+Run with ``python -m benchmarks.bench_suite [--sizes 10,1000] [--output FILE]``.
+Results are written as JSON along with the commit they were measured on;
+pass a previous output with ``--compare FILE`` to report regressions, in
+which case the exit status is 1 if any result is slower or larger than the
+baseline by more than ``--threshold``.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from sonarr import Sonarr, models
+from sonarr.client import orjson
+
+from .common import best_of
+from .generate import GENERATORS
+
+SIZES = (10, 1000, 10000, 100000)
+
+UNITS = {"parse": "s", "memory": "B", "latency": "s"}
+
+
+def parse_episodes(data: List[dict]) -> List[models.Episode]:
+    """Build episodes as Sonarr.calendar() does."""
+    series_cache: Dict[int, models.Series] = {}
+    return [models.Episode.from_dict(result, series_cache) for result in data]
+
+
+def parse_queue(data: List[dict]) -> List[models.QueueItem]:
+    """Build queue items as Sonarr.queue() does."""
+    series_cache: Dict[int, models.Series] = {}
+    return [models.QueueItem.from_dict(result, series_cache) for result in data]
+
+
+PARSERS: Dict[str, Callable[[Any], Any]] = {
+    "series": lambda data: [models.SeriesItem.from_dict(item) for item in data],
+    "calendar": parse_episodes,
+    "queue": parse_queue,
+    "wanted-missing": models.WantedResults.from_dict,
+    "command": lambda data: [models.CommandItem.from_dict(item) for item in data],
+}
+
+# API path and Sonarr method call for each fixture.
+METHODS: Dict[str, Any] = {
+    "series": ("/api/series", lambda client, count: client.series()),
+    "calendar": ("/api/calendar", lambda client, count: client.calendar()),
+    "queue": ("/api/queue", lambda client, count: client.queue()),
+    "wanted-missing": (
+        "/api/wanted/missing",
+        lambda client, count: client.wanted(page_size=count),
+    ),
+    "command": ("/api/command", lambda client, count: client.commands()),
+}
+
+
+def repeats(count: int) -> int:
+    """Return how many times to repeat a measurement of count records."""
+    return 5 if count <= 10000 else 2
+
+
+def measure_parse(fixture: str, data: Any, count: int) -> float:
+    """Return the best time in seconds to build the models of a response."""
+    parser = PARSERS[fixture]
+
+    def run() -> None:
+        # Start with cold datetime caches, as for a fresh process.
+        models.dt_str_to_dt.cache_clear()
+        parser(data)
+
+    number = max(1, 10000 // count)
+    return best_of(run, number=number, repeat=repeats(count))
+
+
+def measure_memory(fixture: str, data: Any, count: int) -> float:
+    """Return the bytes allocated per record by the models of a response."""
+    models.dt_str_to_dt.cache_clear()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = PARSERS[fixture](data)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del result
+    return (after - before) / count
+
+
+async def measure_latency(fixtures: Dict[str, bytes], count: int) -> Dict[str, float]:
+    """Return the best time in seconds of each Sonarr method call."""
+    app = web.Application()
+
+    def handler(body: bytes) -> Callable:
+        async def handle(request: web.Request) -> web.Response:
+            return web.Response(body=body, content_type="application/json")
+
+        return handle
+
+    for fixture, body in fixtures.items():
+        app.router.add_get(METHODS[fixture][0], handler(body))
+
+    results = {}
+    async with TestServer(app) as server:
+        async with Sonarr("127.0.0.1", "BENCHMARK", port=server.port) as client:
+            for fixture in fixtures:
+                call = METHODS[fixture][1]
+                # Connect and warm up the keep-alive connection untimed.
+                await call(client, count)
+
+                timings = []
+                for _ in range(max(repeats(count), min(200, 10000 // count))):
+                    models.dt_str_to_dt.cache_clear()
+                    start = perf_counter()
+                    await call(client, count)
+                    timings.append(perf_counter() - start)
+
+                results[fixture] = min(timings)
+
+    return results
+
+
+def run(sizes: List[int], fixtures: List[str]) -> List[Dict[str, Any]]:
+    """Run the suite and return the results."""
+    results = []
+
+    def add(benchmark: str, fixture: str, count: int, value: float) -> None:
+        results.append(
+            {
+                "benchmark": benchmark,
+                "fixture": fixture,
+                "count": count,
+                "value": value,
+                "unit": UNITS[benchmark],
+            }
+        )
+
+    for count in sizes:
+        bodies = {}
+        for fixture in fixtures:
+            data = GENERATORS[fixture](count)
+            bodies[fixture] = json.dumps(data).encode("utf-8")
+
+            add("parse", fixture, count, measure_parse(fixture, data, count))
+            add("memory", fixture, count, measure_memory(fixture, data, count))
+
+        latencies = asyncio.run(measure_latency(bodies, count))
+        for fixture, value in latencies.items():
+            add("latency", fixture, count, value)
+
+    return results
+
+
+def metadata() -> Dict[str, Any]:
+    """Return the environment the results were measured in."""
+    try:
+        commit: Optional[str] = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "orjson": orjson is not None,
+    }
+
+
+def key(result: Dict[str, Any]) -> str:
+    """Return the name identifying a result across runs."""
+    return f"{result['benchmark']}/{result['fixture']}/{result['count']}"
+
+
+def report(
+    results: List[Dict[str, Any]], baseline: Dict[str, float]
+) -> Dict[str, float]:
+    """Print the results, compared to a baseline if any.
+
+    Returns the changes from the baseline by result name.
+    """
+    print(f"{'benchmark':32} {'value':>14} {'per record':>12} {'change':>8}")
+    changes = {}
+
+    for result in results:
+        name = key(result)
+        value = result["value"]
+
+        if result["unit"] == "s":
+            text = f"{value * 1000:11.3f} ms"
+            per_record = f"{value / result['count'] * 1e6:9.2f} us"
+        else:
+            text = f"{value:12.0f} B"
+            per_record = ""
+
+        change = ""
+        if baseline.get(name):
+            changes[name] = value / baseline[name] - 1
+            change = f"{changes[name]:+8.1%}"
+
+        print(f"{name:32} {text:>14} {per_record:>12} {change:>8}")
+
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in SIZES),
+        help="comma separated record counts",
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=",".join(GENERATORS),
+        help="comma separated fixtures",
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    fixtures = args.fixtures.split(",")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as fptr:
+            baseline = {
+                key(result): result["value"] for result in json.load(fptr)["results"]
+            }
+
+    results = run(sizes, fixtures)
+    changes = report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as fptr:
+            json.dump({"meta": metadata(), "results": results}, fptr, indent=2)
+
+    regressions = [name for name, change in changes.items() if change > args.threshold]
+    for name in regressions:
+        print(f"regression: {name} {changes[name]:+.1%}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Shared helpers for Sonarr benchmarks."""
+import json
+import os
+import timeit
+from typing import Any, Callable, List
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "fixtures")
+
+
+def load_fixture(filename: str) -> Any:
+    """Load and decode a JSON fixture from the test suite."""
+    with open(os.path.join(FIXTURES, filename)) as fptr:
+        return json.load(fptr)
+
+
+def scale(records: List[Any], count: int) -> List[Any]:
+    """Repeat records until the list holds count items."""
+    return [records[i % len(records)] for i in range(count)]
+
+
+def best_of(func: Callable[[], Any], number: int = 1, repeat: int = 5) -> float:
+    """Return the best wall time in seconds of func over repeat runs."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
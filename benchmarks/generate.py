@@ -0,0 +1,118 @@
+"""Synthetic Sonarr API responses scaled from the test fixtures.
+
+Records are copies of the fixture records with distinct ids, titles and
+timestamps, so caches keyed on them behave as with a real library. Episodes
+are spread over series the way a calendar or queue would be.
+"""
+import copy
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from .common import load_fixture
+
+EPISODES_PER_SERIES = 20
+
+EPOCH = datetime(2014, 1, 27, 1, 30)
+
+
+def timestamp(offset: int) -> str:
+    """Return a Sonarr UTC timestamp offset hours from the epoch."""
+    value = EPOCH + timedelta(hours=offset)
+    return value.strftime("%Y-%m-%dT%H:%M:%S") + f".{offset % 10000:04d}Z"
+
+
+def _series(template: dict, index: int) -> dict:
+    """Return a series payload numbered index."""
+    series = copy.deepcopy(template)
+    series["id"] = index + 1
+    series["tvdbId"] = 70000 + index
+    series["title"] = f"{template.get('title', 'Series')} {index}"
+    series["titleSlug"] = f"{template.get('titleSlug', 'series')}-{index}"
+    series["added"] = timestamp(-index)
+    return series
+
+
+def _episode(template: dict, index: int, series_template: dict) -> dict:
+    """Return an episode payload numbered index, nesting its series."""
+    episode = copy.deepcopy(template)
+    series_index = index // EPISODES_PER_SERIES
+    episode["id"] = index + 1
+    episode["seriesId"] = series_index + 1
+    episode["episodeNumber"] = index % EPISODES_PER_SERIES + 1
+    episode["title"] = f"Episode {index}"
+    episode["airDate"] = (EPOCH + timedelta(hours=index)).strftime("%Y-%m-%d")
+    episode["airDateUtc"] = timestamp(index)
+    episode["series"] = _series(series_template, series_index)
+    return episode
+
+
+def series(count: int) -> List[dict]:
+    """Return a series response with count series."""
+    templates = load_fixture("series.json")
+    return [_series(templates[i % len(templates)], i) for i in range(count)]
+
+
+def calendar(count: int) -> List[dict]:
+    """Return a calendar response with count episodes."""
+    templates = load_fixture("calendar.json")
+    return [
+        _episode(templates[i % len(templates)], i, templates[0]["series"])
+        for i in range(count)
+    ]
+
+
+def queue(count: int) -> List[dict]:
+    """Return a queue response with count items."""
+    templates = load_fixture("queue.json")
+    items = []
+
+    for i in range(count):
+        item = copy.deepcopy(templates[i % len(templates)])
+        episode = _episode(item["episode"], i, item["series"])
+        item["series"] = episode.pop("series")
+        item["episode"] = episode
+        item["id"] = i + 1
+        item["downloadId"] = f"SABnzbd_nzo_{i:08d}"
+        item["estimatedCompletionTime"] = timestamp(i)
+        items.append(item)
+
+    return items
+
+
+def wanted_missing(count: int) -> Dict[str, Any]:
+    """Return a wanted missing response with count records on one page."""
+    response = load_fixture("wanted-missing.json")
+    templates = response["records"]
+    response["records"] = [
+        _episode(templates[i % len(templates)], i, templates[0]["series"])
+        for i in range(count)
+    ]
+    response["page"] = 1
+    response["pageSize"] = count
+    response["totalRecords"] = count
+    return response
+
+
+def command(count: int) -> List[dict]:
+    """Return a command response with count commands."""
+    templates = load_fixture("command.json")
+    commands = []
+
+    for i in range(count):
+        item = copy.deepcopy(templates[i % len(templates)])
+        item["id"] = i + 1
+        for key in ("queued", "started", "startedOn", "stateChangeTime"):
+            if key in item:
+                item[key] = timestamp(i)
+        commands.append(item)
+
+    return commands
+
+
+GENERATORS: Dict[str, Callable[[int], Any]] = {
+    "series": series,
+    "calendar": calendar,
+    "queue": queue,
+    "wanted-missing": wanted_missing,
+    "command": command,
+}
@@ -40,6 +40,10 @@ setup(
         "Topic :: Software Development :: Libraries :: Python Modules",
     ],
     description="Asynchronous Python client for the Sonarr API.",
+    extras_require={
+        "columnar": ["numpy>=1.16.0", "pyarrow>=1.0.0"],
+        "speedups": ["orjson>=3.0.0", "brotli>=1.0.0"],
+    },
     include_package_data=True,
     install_requires=list(val.strip() for val in open("requirements.txt")),
     keywords=["sonarr", "api", "async", "client"],
@@ -1,8 +1,18 @@
 """Asynchronous Python client for Sonarr."""
+from .cache import ResponseCache  # noqa
+from .cluster import ClusterResults, SonarrCluster  # noqa
+from .columnar import SeriesColumns  # noqa
 from .exceptions import (  # noqa
     SonarrAccessRestricted,
+    SonarrCircuitOpen,
     SonarrConnectionError,
     SonarrError,
     SonarrResourceNotFound,
 )
+from .index import EpisodeIndex  # noqa
+from .limiter import RequestLimiter  # noqa
+from .metrics import MetricsCollector, RequestObserver  # noqa
+from .mirror import LibraryMirror  # noqa
+from .retry import CircuitBreaker, RetryPolicy  # noqa
 from .sonarr import Client, Sonarr  # noqa
+from .tracker import QueueWatcher, SeriesTracker  # noqa
@@ -0,0 +1,117 @@
+"""Response cache for Sonarr."""
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+DEFAULT_TTLS = {
+    "calendar": 60.0,
+    "command": 0.0,
+    "diskspace": 60.0,
+    "queue": 5.0,
+    "series": 300.0,
+    "system/status": 300.0,
+    "wanted": 60.0,
+}
+
+
+@dataclass
+class CacheEntry:
+    """Object holding a cached API response."""
+
+    data: Any
+    size: int
+    expires: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        """Return if the entry can be used without contacting the API."""
+        return self.expires > monotonic()
+
+    def validators(self) -> Dict[str, str]:
+        """Return the conditional request headers to revalidate the entry."""
+        headers = {}
+
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """In-memory LRU cache of decoded API responses.
+
+    Entries are kept for a time to live looked up by endpoint, then
+    revalidated with conditional requests when the API provided an ETag or
+    Last-Modified header. The least recently used entries are evicted once
+    the cached response bodies exceed max_size bytes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 10.0,
+        ttls: Optional[Mapping[str, float]] = None,
+        max_size: int = 32 * 1024 * 1024,
+    ) -> None:
+        """Initialize response cache."""
+        self.ttl = ttl
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_size = max_size
+        self.size = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    @staticmethod
+    def key(uri: str, params: Optional[Mapping[str, str]] = None) -> Tuple:
+        """Return the cache key for a GET request."""
+        return (uri, tuple(sorted(params.items())) if params else ())
+
+    def ttl_for(self, uri: str) -> float:
+        """Return the time to live for responses of an endpoint."""
+        if uri in self.ttls:
+            return self.ttls[uri]
+
+        return self.ttls.get(uri.split("/", 1)[0], self.ttl)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return a cached entry, marking it as recently used."""
+        entry = self._entries.get(key, None)
+        if entry is not None:
+            self._entries.move_to_end(key)
+
+        return entry
+
+    def set(self, key: Hashable, entry: CacheEntry) -> None:
+        """Store an entry, evicting least recently used entries as needed."""
+        self.pop(key)
+
+        if entry.size > self.max_size:
+            return
+
+        self._entries[key] = entry
+        self.size += entry.size
+
+        while self.size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def pop(self, key: Hashable) -> Optional[CacheEntry]:
+        """Remove and return a cached entry."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+        return entry
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        self._entries.clear()
+        self.size = 0
@@ -1,20 +1,107 @@
 """Asynchronous Python client for Sonarr."""
 import asyncio
 import json
+from contextlib import asynccontextmanager
 from socket import gaierror as SocketGIAError
-from typing import Any, Mapping, Optional
+from time import monotonic, perf_counter
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import aiohttp
 import async_timeout
 from yarl import URL
 
 from .__version__ import __version__
+from .cache import CacheEntry, ResponseCache
+from .compression import Decompressor, accept_encoding, decompress, is_compressed
 from .exceptions import (
     SonarrAccessRestricted,
+    SonarrCircuitOpen,
     SonarrConnectionError,
     SonarrError,
     SonarrResourceNotFound,
 )
+from .limiter import PRIORITY_NORMAL, RequestLimiter
+from .metrics import (
+    ParseMetrics,
+    RequestMetrics,
+    RequestObserver,
+    RequestTrace,
+    endpoint_name,
+    trace_config,
+)
+from .retry import CircuitBreaker, RetryPolicy
+from .signalr import (
+    HANDSHAKE,
+    HUB_PATH,
+    MESSAGE_CLOSE,
+    MESSAGE_INVOCATION,
+    MESSAGE_PING,
+    PING_INTERVAL,
+    SERVER_TIMEOUT,
+    decode_messages,
+    encode_message,
+)
+from .stream import JSONArrayDecoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+STREAM_CHUNK_SIZE = 65536
+
+JSONLoads = Callable[[Union[bytes, str]], Any]
+
+
+def default_json_loads() -> JSONLoads:
+    """Return the fastest available JSON decoder accepting bytes."""
+    if orjson is not None:
+        return orjson.loads
+
+    return json.loads
+
+
+class InFlightRequest:
+    """Object sharing one in-flight API request between its callers."""
+
+    def __init__(self, request: Awaitable) -> None:
+        """Start the shared request."""
+        self.task = asyncio.ensure_future(request)
+        self.task.add_done_callback(self._retrieve_exception)
+        self.waiters = 0
+        self.abandoned = False
+
+    @staticmethod
+    def _retrieve_exception(task: asyncio.Future) -> None:
+        """Mark the exception as retrieved in case every caller was cancelled."""
+        if not task.cancelled():
+            task.exception()
+
+    async def wait(self) -> Any:
+        """Wait for the shared request to complete."""
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if self.waiters == 1:
+                self.abandoned = True
+                self.task.cancel()
+            raise
+        finally:
+            self.waiters -= 1
 
 
 class Client:
@@ -30,11 +117,28 @@ class Client:
         session: aiohttp.client.ClientSession = None,
         tls: bool = False,
         verify_ssl: bool = True,
-        user_agent: str = None,
+        user_agent: Optional[str] = None,
+        json_loads: Optional[JSONLoads] = None,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        cache: Optional[ResponseCache] = None,
+        coalesce_requests: bool = False,
+        observers: Optional[List[RequestObserver]] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[RequestLimiter] = None,
+        compression: bool = True,
     ) -> None:
-        """Initialize connection with receiver."""
+        """Initialize connection with receiver.
+
+        The connection options only apply to the session created by the
+        client itself when no session is provided.
+        """
         self._session = session
         self._close_session = False
+        self._decompress = False
 
         self.api_key = api_key
         self.base_path = base_path
@@ -43,47 +147,156 @@ class Client:
         self.request_timeout = request_timeout
         self.tls = tls
         self.verify_ssl = verify_ssl
-        self.user_agent = user_agent
-
-        if user_agent is None:
-            self.user_agent = f"PythonSonarr/{__version__}"
+        self.user_agent: str = user_agent or f"PythonSonarr/{__version__}"
+        self.json_loads: JSONLoads = json_loads or default_json_loads()
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.cache = cache
+        self.coalesce_requests = coalesce_requests
+        self.observers = list(observers or [])
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self.limiter = limiter
+        self.compression = compression
+        self._in_flight: Dict[Hashable, InFlightRequest] = {}
 
         if self.base_path[-1] != "/":
             self.base_path += "/"
 
-    async def _request(
-        self,
-        uri: str = "",
-        method: str = "GET",
-        data: Optional[Any] = None,
-        params: Optional[Mapping[str, str]] = None,
-    ) -> Any:
-        """Handle a request to API."""
-        scheme = "https" if self.tls else "http"
+        self._url: Optional[Tuple[Hashable, URL]] = None
+        self._header_values: Optional[Tuple[Hashable, Dict[str, str]]] = None
+
+    @property
+    def _base_url(self) -> URL:
+        """Return the API base URL, rebuilt only when its settings change."""
+        key = (self.tls, self.host, self.port, self.base_path)
+
+        if self._url is None or self._url[0] != key:
+            path = self.base_path if self.base_path[-1] == "/" else self.base_path + "/"
+            url = URL.build(
+                scheme="https" if self.tls else "http",
+                host=self.host,
+                port=self.port,
+                path=path,
+            )
+            self._url = (key, url)
+
+        return self._url[1]
+
+    @property
+    def _headers(self) -> Dict[str, str]:
+        """Return the request headers, rebuilt only when their settings change."""
+        key = (self.user_agent, self.compression, self.api_key)
 
-        url = URL.build(
-            scheme=scheme, host=self.host, port=self.port, path=self.base_path
-        ).join(URL(uri))
+        if self._header_values is None or self._header_values[0] != key:
+            headers = {
+                "User-Agent": self.user_agent,
+                "Accept": "application/json, text/plain, */*",
+                "Accept-Encoding": accept_encoding(self.compression),
+                "X-Api-Key": self.api_key,
+            }
+            self._header_values = (key, headers)
 
-        headers = {
-            "User-Agent": self.user_agent,
-            "Accept": "application/json, text/plain, */*",
-            "X-Api-Key": self.api_key,
-        }
+        return self._header_values[1]
 
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a client session with a keep-alive connection pool.
+
+        Responses are decompressed by the client rather than the session so
+        the size of compressed bodies can be measured.
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            limit_per_host=self.connection_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=self.dns_cache_ttl > 0,
+        )
+
+        # DNS and connect timings need tracing hooks on the session itself.
+        trace_configs = [trace_config()] if self.observers else None
+
+        return aiohttp.ClientSession(
+            connector=connector, trace_configs=trace_configs, auto_decompress=False
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the client session, creating one if none was provided."""
         if self._session is None:
-            self._session = aiohttp.ClientSession()
+            self._session = self._create_session()
             self._close_session = True
+            self._decompress = True
+
+        return self._session
+
+    @asynccontextmanager
+    async def _limit(self, uri: str, priority: int) -> AsyncIterator[None]:
+        """Hold a request slot from the limiter, if any, during the context."""
+        if self.limiter is None:
+            yield
+            return
+
+        async with self.limiter.limit(uri, priority):
+            yield
+
+    def _trace(self, method: str, uri: str) -> Optional[RequestTrace]:
+        """Start timing a request when observers are registered."""
+        if not self.observers:
+            return None
+
+        return RequestTrace(method, uri)
+
+    def _observe_request(
+        self,
+        trace: Optional[RequestTrace],
+        status: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Notify observers of a finished request."""
+        if trace is None:
+            return
+
+        metrics: RequestMetrics = trace.finish(status, error)
+        for observer in self.observers:
+            observer.request_finished(metrics)
+
+    def _observe_parse(self, uri: str, start: float, count: int) -> None:
+        """Notify observers of models built from a response since start."""
+        if not self.observers:
+            return
+
+        metrics = ParseMetrics(
+            endpoint=endpoint_name(uri),
+            count=count,
+            duration=perf_counter() - start,
+        )
+        for observer in self.observers:
+            observer.models_parsed(metrics)
+
+    async def _connect(
+        self,
+        method: str,
+        url: URL,
+        data: Optional[Any],
+        params: Optional[Mapping[str, str]],
+        headers: Mapping[str, str],
+        trace: Optional[RequestTrace],
+    ) -> aiohttp.ClientResponse:
+        """Send a single request to API and return the response."""
+        session = self._get_session()
 
         try:
             with async_timeout.timeout(self.request_timeout):
-                response = await self._session.request(
+                return await session.request(
                     method,
                     url,
                     data=data,
                     params=params,
                     headers=headers,
                     ssl=self.verify_ssl,
+                    trace_request_ctx=trace,
                 )
         except asyncio.TimeoutError as exception:
             raise SonarrConnectionError(
@@ -94,6 +307,80 @@ class Client:
                 "Error occurred while communicating with API"
             ) from exception
 
+    async def _send(
+        self,
+        uri: str,
+        method: str,
+        data: Optional[Any],
+        params: Optional[Mapping[str, str]],
+        headers: Optional[Mapping[str, str]] = None,
+        trace: Optional[RequestTrace] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> aiohttp.ClientResponse:
+        """Send a request to API and return the successful response.
+
+        Requests are retried according to the retry policy and fail fast
+        while the circuit breaker is open. Each attempt holds a limiter slot
+        until its response headers arrive, so no slot is held during retry
+        backoff or while the body is read.
+        """
+        url = self._base_url.join(URL(uri))
+
+        if headers:
+            headers = {**self._headers, **headers}
+        else:
+            headers = self._headers
+
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+            exception = SonarrCircuitOpen(
+                "Circuit breaker is open after repeated errors communicating with API"
+            )
+            self._observe_request(trace, error=exception)
+            raise exception
+
+        retry = self.retry
+        if retry is not None and method not in retry.methods:
+            retry = None
+
+        attempt = 1
+        while True:
+            try:
+                async with self._limit(uri, priority):
+                    response = await self._connect(
+                        method, url, data, params, headers, trace
+                    )
+            except SonarrConnectionError as exception:
+                delay = retry.delay(attempt) if retry is not None else None
+                if delay is None:
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record_failure()
+                    self._observe_request(trace, error=exception.__cause__)
+                    raise
+            else:
+                delay = None
+                if retry is not None and response.status in retry.statuses:
+                    delay = retry.delay(attempt, response.headers.get("Retry-After"))
+
+                if delay is None:
+                    break
+
+                response.release()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        if self.circuit_breaker is not None:
+            if response.status // 100 == 5:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+
+        if trace is not None:
+            trace.ttfb = perf_counter() - trace.start
+
+        if (response.status // 100) in [4, 5]:
+            self._observe_request(trace, response.status)
+
         if response.status == 403:
             raise SonarrAccessRestricted(
                 "Access restricted. Please ensure valid API Key is provided", {}
@@ -105,13 +392,11 @@ class Client:
         content_type = response.headers.get("Content-Type", "")
 
         if (response.status // 100) in [4, 5]:
-            content = await response.read()
+            content = self._decompress_body(response, await response.read())
             response.close()
 
             if content_type == "application/json":
-                raise SonarrError(
-                    f"HTTP {response.status}", json.loads(content.decode("utf8"))
-                )
+                raise SonarrError(f"HTTP {response.status}", self.json_loads(content))
 
             raise SonarrError(
                 f"HTTP {response.status}",
@@ -122,11 +407,350 @@ class Client:
                 },
             )
 
-        if "application/json" in content_type:
-            data = await response.json()
-            return data
+        return response
+
+    async def _request(
+        self,
+        uri: str = "",
+        method: str = "GET",
+        data: Optional[Any] = None,
+        params: Optional[Mapping[str, str]] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> Any:
+        """Handle a request to API."""
+        if self.coalesce_requests and method == "GET":
+            return await self._coalesced_request(uri, params, priority)
+
+        if self.cache is not None and method == "GET":
+            return await self._cached_request(self.cache, uri, params, priority)
+
+        return await self._fetch(uri, method, data, params, priority)
+
+    async def _coalesced_request(
+        self, uri: str, params: Optional[Mapping[str, str]], priority: int
+    ) -> Any:
+        """Handle a GET request to API, sharing identical in-flight requests.
+
+        Every caller receives the same decoded result or exception. The
+        request is only cancelled once all of its callers are cancelled.
+        """
+        key = ResponseCache.key(uri, params)
+        flight = self._in_flight.get(key, None)
+
+        # Finished or abandoned requests are only waiting to be removed.
+        if flight is None or flight.abandoned or flight.task.done():
+            if self.cache is not None:
+                request = self._cached_request(self.cache, uri, params, priority)
+            else:
+                request = self._fetch(uri, "GET", None, params, priority)
+
+            flight = self._in_flight[key] = InFlightRequest(request)
+            flight.task.add_done_callback(lambda _: self._end_flight(key, flight))
+
+        return await flight.wait()
+
+    def _end_flight(self, key: Hashable, flight: InFlightRequest) -> None:
+        """Stop sharing a finished request, unless it was already replaced."""
+        if self._in_flight.get(key, None) is flight:
+            del self._in_flight[key]
+
+    async def _fetch(
+        self,
+        uri: str,
+        method: str,
+        data: Optional[Any],
+        params: Optional[Mapping[str, str]],
+        priority: int = PRIORITY_NORMAL,
+    ) -> Any:
+        """Send a request to API and return the decoded response."""
+        trace = self._trace(method, uri)
+        response = await self._send(
+            uri, method, data, params, trace=trace, priority=priority
+        )
+        data, _ = await self._read(response, trace)
+        self._observe_request(trace, response.status)
+        return data
+
+    async def _cached_request(
+        self,
+        cache: ResponseCache,
+        uri: str,
+        params: Optional[Mapping[str, str]],
+        priority: int = PRIORITY_NORMAL,
+    ) -> Any:
+        """Handle a GET request to API through the response cache."""
+        key = cache.key(uri, params)
+        entry = cache.get(key)
+
+        if entry is not None and entry.fresh:
+            return entry.data
+
+        validators = entry.validators() if entry is not None else None
+
+        trace = self._trace("GET", uri)
+        response = await self._send(
+            uri, "GET", None, params, validators, trace, priority
+        )
+        expires = monotonic() + cache.ttl_for(uri)
+
+        if response.status == 304 and entry is not None:
+            response.release()
+            entry.expires = expires
+            self._observe_request(trace, response.status)
+            return entry.data
+
+        data, size = await self._read(response, trace)
+        self._observe_request(trace, response.status)
+        cache.set(
+            key,
+            CacheEntry(
+                data=data,
+                size=size,
+                expires=expires,
+                etag=response.headers.get("ETag", None),
+                last_modified=response.headers.get("Last-Modified", None),
+            ),
+        )
+
+        return data
+
+    async def _read(
+        self, response: aiohttp.ClientResponse, trace: Optional[RequestTrace] = None
+    ) -> Tuple[Any, int]:
+        """Read and decode a response, returning it with the body size."""
+        start = perf_counter()
+        raw = await response.read()
+        body = self._decompress_body(response, raw)
+        read = perf_counter()
+
+        if "application/json" in response.headers.get("Content-Type", ""):
+            # Empty JSON responses decode to None, as with aiohttp.
+            data = self.json_loads(body) if body.strip() else None
+        else:
+            data = body.decode(response.get_encoding())
+
+        if trace is not None:
+            trace.read = read - start
+            trace.decode = perf_counter() - read
+            trace.size = len(body)
+            self._trace_transfer(response, trace, len(raw))
+
+        return data, len(body)
+
+    def _decompress_body(self, response: aiohttp.ClientResponse, body: bytes) -> bytes:
+        """Return a response body, decompressed unless the session already did."""
+        encoding = response.headers.get("Content-Encoding", "").lower()
+
+        if self._decompress and is_compressed(encoding):
+            return decompress(body, encoding)
+
+        return body
+
+    def _trace_transfer(
+        self, response: aiohttp.ClientResponse, trace: RequestTrace, size: int
+    ) -> None:
+        """Record the encoding and transferred size of a response body.
+
+        Bodies decompressed by a session provided to the client are only
+        seen decompressed, so their transferred size is taken from the
+        Content-Length header when present.
+        """
+        encoding = response.headers.get("Content-Encoding", "").lower()
+
+        if not is_compressed(encoding):
+            trace.transferred = size
+            return
+
+        trace.encoding = encoding
+        if self._decompress:
+            trace.transferred = size
+        elif response.content_length is not None:
+            trace.transferred = response.content_length
+
+    async def _stream_request(
+        self,
+        uri: str = "",
+        method: str = "GET",
+        data: Optional[Any] = None,
+        params: Optional[Mapping[str, str]] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> AsyncGenerator[Any, None]:
+        """Handle a request to API, yielding JSON array elements as they arrive."""
+        trace = self._trace(method, uri)
+        response = await self._send(
+            uri, method, data, params, trace=trace, priority=priority
+        )
+
+        try:
+            if "application/json" not in response.headers.get("Content-Type", ""):
+                raise SonarrError("Expected a JSON response from API")
+
+            encoding = response.headers.get("Content-Encoding", "").lower()
+            decompressor = None
+            if self._decompress and is_compressed(encoding):
+                decompressor = Decompressor(encoding)
+
+            decoder = JSONArrayDecoder()
+            transferred = 0
+            try:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    transferred += len(chunk)
+                    if decompressor is not None:
+                        chunk = decompressor.decompress(chunk)
+
+                    if trace is not None:
+                        trace.size += len(chunk)
+
+                    for item in decoder.feed(chunk):
+                        yield item
+            except (asyncio.TimeoutError, aiohttp.ClientError) as exception:
+                self._observe_request(trace, response.status, exception)
+                raise SonarrConnectionError(
+                    "Error occurred while reading API response"
+                ) from exception
+
+            if decompressor is not None:
+                chunk = decompressor.flush()
+                if trace is not None:
+                    trace.size += len(chunk)
+
+                for item in decoder.feed(chunk):
+                    yield item
+
+            decoder.close()
+            if trace is not None:
+                self._trace_transfer(response, trace, transferred)
+            self._observe_request(trace, response.status)
+        except GeneratorExit:
+            # Iteration stopped early, drop the connection with the unread body.
+            response.close()
+            raise
+        finally:
+            response.release()
+
+    async def _connect_hub(self) -> aiohttp.ClientWebSocketResponse:
+        """Open a websocket to the SignalR hub and complete the handshake."""
+        session = self._get_session()
+        url = self._base_url.join(URL(f"../{HUB_PATH}"))
+
+        try:
+            with async_timeout.timeout(self.request_timeout):
+                websocket = await session.ws_connect(
+                    url.with_query(access_token=self.api_key),
+                    headers=self._headers,
+                    ssl=self.verify_ssl,
+                )
+        except aiohttp.WSServerHandshakeError as exception:
+            if exception.status in [401, 403]:
+                raise SonarrAccessRestricted(
+                    "Access restricted. Please ensure valid API Key is provided", {}
+                ) from exception
+
+            raise SonarrConnectionError(
+                "Error occurred while connecting to SignalR hub"
+            ) from exception
+        except asyncio.TimeoutError as exception:
+            raise SonarrConnectionError(
+                "Timeout occurred while connecting to SignalR hub"
+            ) from exception
+        except (aiohttp.ClientError, SocketGIAError) as exception:
+            raise SonarrConnectionError(
+                "Error occurred while connecting to SignalR hub"
+            ) from exception
+
+        try:
+            await websocket.send_str(encode_message(HANDSHAKE))
+            message = await websocket.receive(timeout=self.request_timeout)
+        except (asyncio.TimeoutError, aiohttp.ClientError) as exception:
+            await websocket.close()
+            raise SonarrConnectionError(
+                "Error occurred during SignalR hub handshake"
+            ) from exception
+
+        if message.type != aiohttp.WSMsgType.TEXT:
+            await websocket.close()
+            raise SonarrConnectionError("SignalR hub closed during handshake")
+
+        try:
+            response = decode_messages(message.data, self.json_loads)
+        except ValueError as exception:
+            await websocket.close()
+            raise SonarrConnectionError(
+                "Malformed SignalR hub handshake response"
+            ) from exception
+
+        if not response or not isinstance(response[0], dict):
+            await websocket.close()
+            raise SonarrConnectionError("Malformed SignalR hub handshake response")
+
+        if response[0].get("error", None):
+            await websocket.close()
+            raise SonarrError("SignalR hub handshake failed", response)
+
+        return websocket
+
+    async def _receive_hub(
+        self, websocket: aiohttp.ClientWebSocketResponse
+    ) -> AsyncIterator[dict]:
+        """Yield the arguments of messages invoked by the SignalR hub.
+
+        Pings are sent to keep the connection alive. Returns once the hub
+        closes the connection and raises SonarrConnectionError if it stops
+        responding or sends a frame that is not valid JSON. Messages and
+        arguments that are not JSON objects are skipped.
+        """
+        received = sent = monotonic()
+
+        while True:
+            now = monotonic()
+            if now - received >= SERVER_TIMEOUT:
+                raise SonarrConnectionError("Timeout occurred while waiting for hub")
+
+            try:
+                if now - sent >= PING_INTERVAL:
+                    await websocket.send_str(encode_message({"type": MESSAGE_PING}))
+                    sent = now
+
+                timeout = min(sent + PING_INTERVAL, received + SERVER_TIMEOUT) - now
+                message = await websocket.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                continue
+            except aiohttp.ClientError as exception:
+                raise SonarrConnectionError(
+                    "Error occurred while communicating with SignalR hub"
+                ) from exception
+
+            if message.type == aiohttp.WSMsgType.ERROR:
+                raise SonarrConnectionError(
+                    "Error occurred while communicating with SignalR hub"
+                ) from message.data
+
+            if message.type != aiohttp.WSMsgType.TEXT:
+                return
+
+            received = monotonic()
+
+            try:
+                items = decode_messages(message.data, self.json_loads)
+            except ValueError as exception:
+                raise SonarrConnectionError(
+                    "Malformed message received from SignalR hub"
+                ) from exception
+
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+
+                if item.get("type", None) == MESSAGE_CLOSE:
+                    return
+
+                if item.get("type", None) != MESSAGE_INVOCATION:
+                    continue
 
-        return await response.text()
+                arguments = item.get("arguments", None)
+                for argument in arguments if isinstance(arguments, list) else []:
+                    if isinstance(argument, dict):
+                        yield argument
 
     async def close_session(self) -> None:
         """Close open client session."""
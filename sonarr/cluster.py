@@ -0,0 +1,154 @@
+"""Multi-instance client for Sonarr."""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+import async_timeout
+
+from .exceptions import SonarrConnectionError, SonarrError
+from .models import slotted
+from .sonarr import Sonarr
+
+
+@slotted
+@dataclass(frozen=True)
+class ClusterResults:
+    """Object holding results and errors of a call to every instance."""
+
+    results: Dict[str, Any]
+    errors: Dict[str, Exception]
+
+    def merged(self) -> List[Tuple[str, Any]]:
+        """Return results of all instances tagged with the instance name.
+
+        List results are merged item by item, other results such as the
+        Application objects of update() are tagged as a single item.
+        """
+        merged = []
+        for instance, result in self.results.items():
+            if isinstance(result, list):
+                merged.extend((instance, item) for item in result)
+            else:
+                merged.append((instance, result))
+
+        return merged
+
+
+class SonarrCluster:
+    """Fan out calls to multiple Sonarr instances sharing one session.
+
+    Calls run concurrently with at most max_concurrency instances queried
+    at a time, each bounded by instance_timeout seconds. Failing instances
+    are reported in the results instead of failing the whole call.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.client.ClientSession = None,
+        max_concurrency: int = 10,
+        instance_timeout: float = 10,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 10,
+    ) -> None:
+        """Initialize an empty cluster."""
+        self._session = session
+        self._close_session = False
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.instances: Dict[str, Sonarr] = {}
+        self.max_concurrency = max_concurrency
+        self.instance_timeout = instance_timeout
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+
+    def add(self, name: str, host: str, api_key: str, **kwargs: Any) -> Sonarr:
+        """Add a Sonarr instance to the cluster and return its client."""
+        if name in self.instances:
+            raise SonarrError(f"Sonarr instance {name} is already registered")
+
+        client = Sonarr(host, api_key, session=self._session, **kwargs)
+        self.instances[name] = client
+        return client
+
+    async def calendar(self, start: str = None, end: str = None) -> ClusterResults:
+        """Get upcoming episodes of all instances."""
+        return await self._fan_out("calendar", start, end)
+
+    async def queue(self) -> ClusterResults:
+        """Get currently downloading info of all instances."""
+        return await self._fan_out("queue")
+
+    async def series(self) -> ClusterResults:
+        """Return all series of all instances."""
+        return await self._fan_out("series")
+
+    async def update(self, full_update: bool = False) -> ClusterResults:
+        """Get information about the application of all instances."""
+        return await self._fan_out("update", full_update)
+
+    async def _fan_out(self, method: str, *args: Any) -> ClusterResults:
+        """Call a Sonarr method on all instances concurrently."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.connection_limit,
+                    limit_per_host=self.connection_limit_per_host,
+                )
+            )
+            self._close_session = True
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        for client in self.instances.values():
+            if client._session is None:
+                client._session = self._session
+
+        async def call(name: str, client: Sonarr) -> Tuple[str, Any, Any]:
+            async with self._semaphore:
+                try:
+                    with async_timeout.timeout(self.instance_timeout):
+                        return name, await getattr(client, method)(*args), None
+                except asyncio.TimeoutError:
+                    return (
+                        name,
+                        None,
+                        SonarrConnectionError(
+                            f"Timeout occurred while calling {method} on {name}"
+                        ),
+                    )
+                except asyncio.CancelledError:
+                    raise
+                # Any failure of one instance is reported instead of raised.
+                except Exception as exception:  # pylint: disable=broad-except
+                    return name, None, exception
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, Exception] = {}
+
+        for name, result, error in await asyncio.gather(
+            *(call(name, client) for name, client in self.instances.items())
+        ):
+            if error is None:
+                results[name] = result
+            else:
+                errors[name] = error
+
+        return ClusterResults(results=results, errors=errors)
+
+    async def close_session(self) -> None:
+        """Close open client sessions."""
+        for client in self.instances.values():
+            await client.close_session()
+
+        if self._session and self._close_session:
+            await self._session.close()
+
+    async def __aenter__(self) -> "SonarrCluster":
+        """Async enter."""
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        await self.close_session()
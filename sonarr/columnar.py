@@ -0,0 +1,195 @@
+"""Columnar export of Sonarr libraries."""
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .exceptions import SonarrError
+from .optional import import_numpy, import_pyarrow
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pyarrow
+
+# Columns as (name, typecode, key, default); a typecode of None marks a
+# string column. Names follow the fields of the Series, SeriesItem and
+# Season models.
+SERIES_COLUMNS: List[Tuple[str, Optional[str], str, Any]] = [
+    ("series_id", "q", "id", 0),
+    ("tvdb_id", "q", "tvdbId", 0),
+    ("title", None, "title", ""),
+    ("series_type", None, "seriesType", "unknown"),
+    ("status", None, "status", "unknown"),
+    ("network", None, "network", "Unknown"),
+    ("year", "q", "year", 0),
+    ("runtime", "q", "runtime", 0),
+    ("seasons", "q", "seasonCount", 0),
+    ("monitored", "?", "monitored", False),
+    ("downloaded", "q", "episodeFileCount", 0),
+    ("episodes", "q", "episodeCount", 0),
+    ("total_episodes", "q", "totalEpisodeCount", 0),
+    ("diskspace", "q", "sizeOnDisk", 0),
+]
+
+# Season columns read from the season itself unless marked as statistics.
+SEASON_COLUMNS: List[Tuple[str, Optional[str], str, Any, bool]] = [
+    ("number", "q", "seasonNumber", 0, False),
+    ("monitored", "?", "monitored", False, False),
+    ("downloaded", "q", "episodeFileCount", 0, True),
+    ("episodes", "q", "episodeCount", 0, True),
+    ("total_episodes", "q", "totalEpisodeCount", 0, True),
+    ("progress", "d", "percentOfEpisodes", 0.0, True),
+    ("diskspace", "q", "sizeOnDisk", 0, True),
+]
+
+NUMPY_TYPES = {"q": "int64", "d": "float64", "?": "bool"}
+ARRAY_TYPES = {"q": "q", "d": "d", "?": "b"}
+
+
+def column(values: list, typecode: Optional[str]) -> Sequence:
+    """Return a column of values with an array typecode.
+
+    Numeric columns are NumPy arrays when NumPy is installed and stdlib
+    arrays otherwise. String columns are lists.
+    """
+    if typecode is None:
+        return values
+
+    numpy = import_numpy()
+    if numpy is not None:
+        return numpy.array(values, dtype=NUMPY_TYPES[typecode])
+
+    return array(ARRAY_TYPES[typecode], values)
+
+
+def percent(part: int, whole: int) -> float:
+    """Return part as a percentage of whole, or 0 if whole is 0."""
+    return part / whole * 100 if whole else 0.0
+
+
+class SeriesColumns:
+    """Columns of series and season fields from a series API response.
+
+    Columns are read straight from the raw payloads without building
+    models. Aggregates are computed over whole columns, optionally grouped
+    by another series column such as "network".
+    """
+
+    def __init__(self, data: List[dict]) -> None:
+        """Build columns from a series API response."""
+        self.series: Dict[str, Sequence] = {}
+        self.seasons: Dict[str, Sequence] = {}
+        self._groups: Dict[str, Tuple[list, Any]] = {}
+
+        for name, typecode, key, default in SERIES_COLUMNS:
+            if typecode is None:
+                values = [item.get(key, None) or default for item in data]
+            else:
+                values = [item.get(key, default) for item in data]
+
+            self.series[name] = column(values, typecode)
+
+        series_ids = []
+        seasons = []
+        for item in data:
+            for season in item.get("seasons", []):
+                series_ids.append(item.get("id", 0))
+                seasons.append(season)
+
+        statistics = [season.get("statistics", {}) for season in seasons]
+
+        self.seasons["series_id"] = column(series_ids, "q")
+        for name, typecode, key, default, stats in SEASON_COLUMNS:
+            source = statistics if stats else seasons
+            values = [item.get(key, default) for item in source]
+            self.seasons[name] = column(values, typecode)
+
+    def __len__(self) -> int:
+        """Return the number of series."""
+        return len(self.series["series_id"])
+
+    def diskspace(self, by: Optional[str] = None) -> Union[int, Dict[Any, int]]:
+        """Return the bytes used on disk, in total or per group."""
+        return self._sum("diskspace", by)
+
+    def downloaded(self, by: Optional[str] = None) -> Union[int, Dict[Any, int]]:
+        """Return the number of downloaded episodes, in total or per group."""
+        return self._sum("downloaded", by)
+
+    def total_episodes(self, by: Optional[str] = None) -> Union[int, Dict[Any, int]]:
+        """Return the number of episodes, in total or per group."""
+        return self._sum("total_episodes", by)
+
+    def progress(self, by: Optional[str] = None) -> Union[float, Dict[Any, float]]:
+        """Return the percentage of monitored episodes downloaded.
+
+        The percentage is computed in total or per group, weighted by the
+        number of episodes of each series.
+        """
+        downloaded = self._sum("downloaded", by)
+        episodes = self._sum("episodes", by)
+
+        if by is None:
+            return percent(downloaded, episodes)
+
+        return {key: percent(downloaded[key], episodes[key]) for key in episodes}
+
+    def to_arrow(self, seasons: bool = False) -> "pyarrow.Table":
+        """Return the series, or season, columns as an Arrow table."""
+        pyarrow = import_pyarrow()
+        if pyarrow is None:
+            raise SonarrError("Arrow export requires pyarrow to be installed")
+
+        if seasons:
+            columns = self.seasons
+            typecodes = {name: typecode for name, typecode, *_ in SEASON_COLUMNS}
+        else:
+            columns = self.series
+            typecodes = {name: typecode for name, typecode, *_ in SERIES_COLUMNS}
+
+        typecodes["series_id"] = "q"
+        arrow_types = {
+            None: pyarrow.string(),
+            "q": pyarrow.int64(),
+            "d": pyarrow.float64(),
+            "?": pyarrow.bool_(),
+        }
+
+        arrays = {}
+        for name, values in columns.items():
+            typecode = typecodes[name]
+            if typecode == "?" and isinstance(values, array):
+                values = [bool(value) for value in values]
+
+            arrays[name] = pyarrow.array(values, type=arrow_types[typecode])
+
+        return pyarrow.table(arrays)
+
+    def _sum(self, name: str, by: Optional[str]) -> Union[int, Dict[Any, int]]:
+        """Return the sum of a series column, in total or per group."""
+        values = self.series[name]
+
+        if by is None:
+            return sum(values) if isinstance(values, array) else int(values.sum())
+
+        if isinstance(values, array):
+            totals: Dict[Any, int] = {}
+            for key, value in zip(self.series[by], values):
+                totals[key] = totals.get(key, 0) + value
+
+            return totals
+
+        numpy = import_numpy()
+        groups, inverse = self._grouping(by)
+        sums = numpy.zeros(len(groups), dtype=numpy.int64)
+        numpy.add.at(sums, inverse, values)
+        return dict(zip(groups, sums.tolist()))
+
+    def _grouping(self, by: str) -> Tuple[list, Any]:
+        """Return the distinct values of a column and the group of each row."""
+        grouping = self._groups.get(by, None)
+        if grouping is None:
+            numpy = import_numpy()
+            groups, inverse = numpy.unique(
+                numpy.asarray(self.series[by]), return_inverse=True
+            )
+            grouping = self._groups[by] = (groups.tolist(), inverse)
+
+        return grouping
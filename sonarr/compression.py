@@ -0,0 +1,117 @@
+"""Response compression for Sonarr."""
+import zlib
+from typing import Any
+
+from .exceptions import SonarrError
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+IDENTITY = "identity"
+
+
+def accept_encoding(compression: bool = True) -> str:
+    """Return the Accept-Encoding header value for API requests.
+
+    Brotli is only offered when a brotli module is installed.
+    """
+    if not compression:
+        return IDENTITY
+
+    if brotli is not None:
+        return "br, gzip, deflate"
+
+    return "gzip, deflate"
+
+
+def is_compressed(encoding: str) -> bool:
+    """Return whether a Content-Encoding header value denotes compression."""
+    return encoding not in ("", IDENTITY)
+
+
+def is_zlib_header(data: bytes) -> bool:
+    """Return whether data starts with a zlib header."""
+    return data[0] & 0x0F == zlib.DEFLATED and (data[0] << 8 | data[1]) % 31 == 0
+
+
+class Decompressor:
+    """Decompress a response body incrementally as chunks arrive."""
+
+    def __init__(self, encoding: str) -> None:
+        """Initialize decompressor for a Content-Encoding header value."""
+        self.encoding = encoding.strip().lower()
+        self._header = b""
+        self._started = False
+        # A zlib decompress object, or a brotli Decompressor for br, or None
+        # until a deflate stream shows whether it is zlib wrapped.
+        self._decompressor: Any = None
+
+        if self.encoding == "gzip":
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "br" and brotli is not None:
+            self._decompressor = brotli.Decompressor()
+        elif self.encoding != "deflate":
+            raise SonarrError(f"Unsupported response encoding: {encoding}")
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Return the decompressed data available after a chunk."""
+        if not chunk:
+            return b""
+
+        self._started = True
+
+        if self._decompressor is None:
+            # Servers send deflate with or without the zlib wrapper, which
+            # aiohttp accepts as well.
+            chunk = self._header + chunk
+            if len(chunk) < 2:
+                self._header = chunk
+                return b""
+
+            wbits = zlib.MAX_WBITS if is_zlib_header(chunk) else -zlib.MAX_WBITS
+            self._decompressor = zlib.decompressobj(wbits)
+
+        try:
+            if self.encoding == "br":
+                return self._decompressor.process(chunk)
+
+            return self._decompressor.decompress(chunk)
+        except Exception as exception:
+            raise SonarrError(
+                "Error occurred while decompressing API response"
+            ) from exception
+
+    def flush(self) -> bytes:
+        """Return any remaining decompressed data.
+
+        Raises SonarrError if the compressed stream is truncated. Empty
+        bodies are accepted.
+        """
+        if not self._started:
+            return b""
+
+        if self._decompressor is None:
+            data = b""
+            finished = False
+        elif self.encoding == "br":
+            data = b""
+            finished = self._decompressor.is_finished()
+        else:
+            data = self._decompressor.flush()
+            finished = self._decompressor.eof
+
+        if not finished:
+            raise SonarrError("Incomplete compressed API response")
+
+        return data
+
+
+def decompress(body: bytes, encoding: str) -> bytes:
+    """Return a complete response body decompressed."""
+    decompressor = Decompressor(encoding)
+    return decompressor.decompress(body) + decompressor.flush()
@@ -1 +1,3 @@
 """Constants for Sonarr."""
+
+DT_CACHE_SIZE = 4096
@@ -13,6 +13,12 @@ class SonarrConnectionError(SonarrError):
     pass
 
 
+class SonarrCircuitOpen(SonarrConnectionError):
+    """Sonarr circuit breaker open exception."""
+
+    pass
+
+
 class SonarrAccessRestricted(SonarrError):
     """Sonarr access restricted exception."""
 
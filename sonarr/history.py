@@ -0,0 +1,103 @@
+"""Disk usage history for Sonarr."""
+from array import array
+from typing import Optional, Tuple
+
+from .exceptions import SonarrError
+from .optional import import_numpy
+
+
+def slope(times: array, values: array) -> Optional[float]:
+    """Return the least squares slope of values over times.
+
+    Returns None with fewer than two samples or no time between them.
+    """
+    count = len(times)
+    if count < 2:
+        return None
+
+    numpy = import_numpy()
+    if numpy is not None:
+        x = numpy.frombuffer(times, dtype=numpy.float64)
+        y = numpy.frombuffer(values, dtype=numpy.int64).astype(numpy.float64)
+        x = x - x.mean()
+        denominator = float(numpy.dot(x, x))
+        if not denominator:
+            return None
+
+        return float(numpy.dot(x, y - y.mean())) / denominator
+
+    mean_x = sum(times) / count
+    mean_y = sum(values) / count
+    denominator = sum((x - mean_x) ** 2 for x in times)
+    if not denominator:
+        return None
+
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(times, values))
+    return numerator / denominator
+
+
+class DiskHistory:
+    """Bounded ring buffer of used and total space samples of a disk.
+
+    Samples are stored in arrays of fixed size, overwriting the oldest
+    sample once full.
+    """
+
+    def __init__(self, size: int = 1024) -> None:
+        """Initialize an empty history holding up to size samples."""
+        if size <= 0:
+            raise SonarrError("Disk history must hold at least one sample")
+
+        self.size = size
+        self._times = array("d", bytes(8 * size))
+        self._used = array("q", bytes(8 * size))
+        self._total = array("q", bytes(8 * size))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return self._count
+
+    def record(self, timestamp: float, free: int, total: int) -> None:
+        """Record the free and total space of the disk at a timestamp."""
+        self._times[self._next] = timestamp
+        self._used[self._next] = total - free
+        self._total[self._next] = total
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def samples(self) -> Tuple[array, array, array]:
+        """Return the timestamps, used and total space, oldest first."""
+        if self._count < self.size:
+            end = self._count
+            return self._times[:end], self._used[:end], self._total[:end]
+
+        start = self._next
+        return (
+            self._times[start:] + self._times[:start],
+            self._used[start:] + self._used[:start],
+            self._total[start:] + self._total[:start],
+        )
+
+    def rate(self) -> Optional[float]:
+        """Return the growth of used space in bytes per second.
+
+        The rate is the least squares fit over all samples, negative when
+        space is being freed. Returns None without enough samples.
+        """
+        times, used, _ = self.samples()
+        return slope(times, used)
+
+    def time_to_full(self) -> Optional[float]:
+        """Return the estimated seconds until the disk is full.
+
+        The estimate is measured from the latest sample at the current rate.
+        Returns None if the disk is not filling up.
+        """
+        rate = self.rate()
+        if rate is None or rate <= 0:
+            return None
+
+        latest = (self._next - 1) % self.size
+        return max(self._total[latest] - self._used[latest], 0) / rate
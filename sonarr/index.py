@@ -0,0 +1,133 @@
+"""In-memory episode index for Sonarr."""
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import Episode
+
+AirKey = Tuple[datetime, int]
+
+# Batches smaller than the index by this factor are inserted one by one.
+REBUILD_RATIO = 16
+
+
+class EpisodeIndex:
+    """Index episodes by air time, episode id and series id.
+
+    Episodes are kept sorted by air time for range queries in O(log n) plus
+    the size of the result, and hashed by episode id and series id. Adding
+    an episode with a known id replaces the previous one. Episodes without
+    an air time are only reachable by id. Air times are compared as
+    returned by Sonarr, so queries should use timezone-aware datetimes.
+    """
+
+    def __init__(self, episodes: Iterable[Episode] = ()) -> None:
+        """Initialize index with episodes."""
+        self._episodes: Dict[int, Episode] = {}
+        self._series: Dict[int, Dict[int, Episode]] = {}
+        self._keys: List[AirKey] = []
+        self._by_air: List[Episode] = []
+
+        self.update(episodes)
+
+    def __len__(self) -> int:
+        """Return the number of indexed episodes."""
+        return len(self._episodes)
+
+    def __contains__(self, episode_id: object) -> bool:
+        """Return if an episode id is indexed."""
+        return episode_id in self._episodes
+
+    def __iter__(self) -> Iterator[Episode]:
+        """Iterate over episodes with an air time in air time order."""
+        return iter(self._by_air)
+
+    def get(self, episode_id: int) -> Optional[Episode]:
+        """Return the episode with an id, if indexed."""
+        return self._episodes.get(episode_id, None)
+
+    def upsert(self, episode: Episode) -> None:
+        """Add an episode to the index, replacing one with the same id."""
+        self._remove(episode.episode_id)
+        self._add(episode)
+
+        if episode.airs is not None:
+            key = (episode.airs, episode.episode_id)
+            pos = bisect_left(self._keys, key)
+            self._keys.insert(pos, key)
+            self._by_air.insert(pos, episode)
+
+    def update(self, episodes: Iterable[Episode]) -> None:
+        """Add many episodes to the index, such as a calendar() response.
+
+        Unless the batch is small compared to the index, the air time order
+        is rebuilt once rather than updated per episode.
+        """
+        episodes = list(episodes)
+        if len(episodes) * REBUILD_RATIO < len(self._episodes):
+            for episode in episodes:
+                self.upsert(episode)
+            return
+
+        for episode in episodes:
+            self._remove(episode.episode_id, ordered=False)
+            self._add(episode)
+
+        self._rebuild()
+
+    def remove(self, episode_id: int) -> Optional[Episode]:
+        """Remove an episode from the index and return it, if indexed."""
+        return self._remove(episode_id)
+
+    def between(self, start: datetime, end: datetime) -> List[Episode]:
+        """Return episodes airing from start up to but excluding end."""
+        lower = bisect_left(self._keys, (start,))
+        upper = bisect_left(self._keys, (end,), lower)
+        return self._by_air[lower:upper]
+
+    def for_series(self, series_id: int) -> List[Episode]:
+        """Return the episodes of a series by season and episode number."""
+        episodes = self._series.get(series_id, {}).values()
+        return sorted(
+            episodes,
+            key=lambda episode: (episode.season_number, episode.episode_number),
+        )
+
+    def _add(self, episode: Episode) -> None:
+        """Add an episode to the id and series hashes."""
+        self._episodes[episode.episode_id] = episode
+        series = self._series.setdefault(episode.series.series_id, {})
+        series[episode.episode_id] = episode
+
+    def _remove(self, episode_id: int, ordered: bool = True) -> Optional[Episode]:
+        """Remove an episode from the hashes and, if ordered, the air order.
+
+        If not ordered, the air order must be rebuilt afterwards.
+        """
+        episode = self._episodes.pop(episode_id, None)
+        if episode is None:
+            return None
+
+        series = self._series.get(episode.series.series_id, {})
+        series.pop(episode_id, None)
+        if not series:
+            self._series.pop(episode.series.series_id, None)
+
+        if ordered and episode.airs is not None:
+            pos = bisect_left(self._keys, (episode.airs, episode_id))
+            del self._keys[pos]
+            del self._by_air[pos]
+
+        return episode
+
+    def _rebuild(self) -> None:
+        """Rebuild the air time order from the id hash."""
+        self._by_air = sorted(
+            (
+                episode
+                for episode in self._episodes.values()
+                if episode.airs is not None
+            ),
+            key=lambda episode: (episode.airs, episode.episode_id),
+        )
+        self._keys = [(episode.airs, episode.episode_id) for episode in self._by_air]
@@ -0,0 +1,153 @@
+"""Client-side rate and concurrency limiting for Sonarr."""
+import asyncio
+import heapq
+from contextlib import asynccontextmanager
+from itertools import count
+from time import monotonic
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+from .metrics import endpoint_name
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+
+class TokenBucket:
+    """Token bucket allowing rate requests per second with bursts of burst."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = monotonic()
+
+    def wait_time(self) -> float:
+        """Return the seconds until a token is available."""
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            return 0.0
+
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        """Take a token from the bucket."""
+        self.tokens -= 1
+
+
+class RequestLimiter:
+    """Limit the request rate and concurrency towards a Sonarr instance.
+
+    Requests wait for a free slot out of max_concurrency and for a token
+    from the global and per-endpoint token buckets. Waiting requests are
+    served by priority, so interactive requests jump ahead of queued
+    background requests, and in arrival order within a priority.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 1,
+        max_concurrency: Optional[int] = None,
+        endpoint_rates: Optional[Mapping[str, Tuple[float, int]]] = None,
+    ) -> None:
+        """Initialize limiter; rates are in requests per second."""
+        self.max_concurrency = max_concurrency
+        self.active = 0
+
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._endpoint_buckets: Dict[str, TokenBucket] = {
+            endpoint: TokenBucket(endpoint_rate, endpoint_burst)
+            for endpoint, (endpoint_rate, endpoint_burst) in (
+                endpoint_rates or {}
+            ).items()
+        }
+        self._waiters: List[Tuple[int, int, asyncio.Future, str]] = []
+        self._sequence = count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def limit(
+        self, uri: str, priority: int = PRIORITY_NORMAL
+    ) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of the context."""
+        await self.acquire(uri, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, uri: str, priority: int = PRIORITY_NORMAL) -> None:
+        """Wait until a request to an endpoint may be sent."""
+        waiter = asyncio.get_event_loop().create_future()
+        heapq.heappush(
+            self._waiters, (priority, next(self._sequence), waiter, endpoint_name(uri))
+        )
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Release a request slot."""
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Let waiting requests through while slots and tokens are available.
+
+        Waiters whose endpoint has no tokens left are skipped, so they only
+        hold back waiters for the same endpoint.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        skipped = []
+        wait: Optional[float] = None
+
+        while self._waiters:
+            if self.max_concurrency is not None and self.active >= self.max_concurrency:
+                break
+
+            _, _, waiter, endpoint = self._waiters[0]
+            if waiter.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            if self._bucket is not None:
+                bucket_wait = self._bucket.wait_time()
+                if bucket_wait > 0:
+                    wait = bucket_wait if wait is None else min(wait, bucket_wait)
+                    break
+
+            endpoint_bucket = self._endpoint_buckets.get(endpoint, None)
+            if endpoint_bucket is not None:
+                bucket_wait = endpoint_bucket.wait_time()
+                if bucket_wait > 0:
+                    wait = bucket_wait if wait is None else min(wait, bucket_wait)
+                    skipped.append(heapq.heappop(self._waiters))
+                    continue
+
+                endpoint_bucket.consume()
+
+            if self._bucket is not None:
+                self._bucket.consume()
+
+            heapq.heappop(self._waiters)
+            self.active += 1
+            waiter.set_result(None)
+
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+
+        if wait is not None:
+            self._timer = asyncio.get_event_loop().call_later(wait, self._dispatch)
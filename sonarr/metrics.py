@@ -0,0 +1,292 @@
+"""Request instrumentation for Sonarr."""
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from .models import slotted
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+RE_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_name(uri: str) -> str:
+    """Return the endpoint of a URI, with numeric ids replaced by a placeholder."""
+    return RE_ID_SEGMENT.sub("/{id}", uri.split("?", 1)[0])
+
+
+@slotted
+@dataclass(frozen=True)
+class RequestMetrics:
+    """Object holding timings in seconds and sizes of a single API request.
+
+    Phases that did not happen or could not be observed are None; DNS and
+    connect timings are only available on sessions created by the client.
+    The size is of the decompressed body, transferred is the size of the
+    body as sent by the server when known.
+    """
+
+    method: str
+    endpoint: str
+    status: Optional[int]
+    total: float
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    read: Optional[float] = None
+    decode: Optional[float] = None
+    size: int = 0
+    transferred: Optional[int] = None
+    encoding: Optional[str] = None
+    error: Optional[str] = None
+
+
+@slotted
+@dataclass(frozen=True)
+class ParseMetrics:
+    """Object holding the time in seconds to build models from a response."""
+
+    endpoint: str
+    count: int
+    duration: float
+
+
+class RequestTrace:
+    """Timings of a single API request, filled in as it progresses."""
+
+    __slots__ = (
+        "method",
+        "endpoint",
+        "start",
+        "dns_start",
+        "dns",
+        "connect_start",
+        "connect",
+        "ttfb",
+        "read",
+        "decode",
+        "size",
+        "transferred",
+        "encoding",
+    )
+
+    def __init__(self, method: str, uri: str) -> None:
+        """Start timing a request."""
+        self.method = method
+        self.endpoint = endpoint_name(uri)
+        self.start = perf_counter()
+        self.dns_start: Optional[float] = None
+        self.dns: Optional[float] = None
+        self.connect_start: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.read: Optional[float] = None
+        self.decode: Optional[float] = None
+        self.size = 0
+        self.transferred: Optional[int] = None
+        self.encoding: Optional[str] = None
+
+    def finish(
+        self, status: Optional[int] = None, error: Optional[BaseException] = None
+    ) -> RequestMetrics:
+        """Return the metrics of the finished request."""
+        return RequestMetrics(
+            method=self.method,
+            endpoint=self.endpoint,
+            status=status,
+            total=perf_counter() - self.start,
+            dns=self.dns,
+            connect=self.connect,
+            ttfb=self.ttfb,
+            read=self.read,
+            decode=self.decode,
+            size=self.size,
+            transferred=self.transferred,
+            encoding=self.encoding,
+            error=None if error is None else type(error).__name__,
+        )
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """Return an aiohttp trace config recording DNS and connect timings.
+
+    Timings are stored on the RequestTrace passed as trace_request_ctx.
+    """
+
+    def tracer(attribute: str, started: bool):
+        async def callback(session, context, params) -> None:
+            trace = context.trace_request_ctx
+            if not isinstance(trace, RequestTrace):
+                return
+
+            if started:
+                setattr(trace, f"{attribute}_start", perf_counter())
+            elif getattr(trace, f"{attribute}_start") is not None:
+                elapsed = perf_counter() - getattr(trace, f"{attribute}_start")
+                setattr(trace, attribute, elapsed)
+
+        return callback
+
+    config = aiohttp.TraceConfig()
+    config.on_dns_resolvehost_start.append(tracer("dns", True))
+    config.on_dns_resolvehost_end.append(tracer("dns", False))
+    config.on_connection_create_start.append(tracer("connect", True))
+    config.on_connection_create_end.append(tracer("connect", False))
+    return config
+
+
+class RequestObserver:
+    """Base class for observers of API request and model parse metrics."""
+
+    def request_finished(self, metrics: RequestMetrics) -> None:
+        """Handle the metrics of a finished API request."""
+
+    def models_parsed(self, metrics: ParseMetrics) -> None:
+        """Handle the metrics of building models from an API response."""
+
+
+class Histogram:
+    """Cumulative histogram of observed values."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize an empty histogram."""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return the upper bounds and cumulative counts of all buckets."""
+        result = []
+        total = 0
+
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+
+        return result
+
+
+class MetricsCollector(RequestObserver):
+    """Observer collecting request and parse metrics in histograms per endpoint."""
+
+    PHASES = ("total", "dns", "connect", "ttfb", "read", "decode")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize an empty collector."""
+        self.buckets = tuple(buckets)
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.parse_durations: Dict[str, Histogram] = {}
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.response_bytes: Dict[str, int] = {}
+        self.transferred_bytes: Dict[Tuple[str, str], int] = {}
+        self.parsed_models: Dict[str, int] = {}
+
+    def request_finished(self, metrics: RequestMetrics) -> None:
+        """Record the metrics of a finished API request."""
+        for phase in self.PHASES:
+            value = getattr(metrics, phase)
+            if value is not None:
+                histogram = self._histogram(self.durations, (metrics.endpoint, phase))
+                histogram.observe(value)
+
+        status = str(metrics.status) if metrics.status is not None else "error"
+        key = (metrics.endpoint, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+        self.response_bytes[metrics.endpoint] = (
+            self.response_bytes.get(metrics.endpoint, 0) + metrics.size
+        )
+
+        if metrics.transferred is not None:
+            key = (metrics.endpoint, metrics.encoding or "identity")
+            self.transferred_bytes[key] = (
+                self.transferred_bytes.get(key, 0) + metrics.transferred
+            )
+
+    def models_parsed(self, metrics: ParseMetrics) -> None:
+        """Record the metrics of building models from an API response."""
+        histogram = self._histogram(self.parse_durations, metrics.endpoint)
+        histogram.observe(metrics.duration)
+        self.parsed_models[metrics.endpoint] = (
+            self.parsed_models.get(metrics.endpoint, 0) + metrics.count
+        )
+
+    def _histogram(self, histograms: dict, key) -> Histogram:
+        """Return the histogram for a key, creating it when needed."""
+        histogram = histograms.get(key, None)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(self.buckets)
+
+        return histogram
+
+    def to_prometheus(self) -> str:
+        """Return the collected metrics in the Prometheus text format."""
+        lines: List[str] = []
+
+        def histogram(name: str, help_text: str, histograms: dict, labels) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+
+            for key, values in sorted(histograms.items()):
+                label = labels(key)
+                for bound, count in values.cumulative():
+                    lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{label}}} {values.sum!r}")
+                lines.append(f"{name}_count{{{label}}} {values.count}")
+
+        def counter(name: str, help_text: str, values: dict, labels) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+
+            for key, value in sorted(values.items()):
+                lines.append(f"{name}{{{labels(key)}}} {value}")
+
+        histogram(
+            "sonarr_request_duration_seconds",
+            "Duration of API request phases.",
+            self.durations,
+            lambda key: f'endpoint="{key[0]}",phase="{key[1]}"',
+        )
+        counter(
+            "sonarr_requests_total",
+            "API requests by response status.",
+            self.requests,
+            lambda key: f'endpoint="{key[0]}",status="{key[1]}"',
+        )
+        counter(
+            "sonarr_response_bytes_total",
+            "Bytes of decompressed API response bodies.",
+            self.response_bytes,
+            lambda key: f'endpoint="{key}"',
+        )
+        counter(
+            "sonarr_response_transferred_bytes_total",
+            "Bytes of API response bodies as transferred, by content encoding.",
+            self.transferred_bytes,
+            lambda key: f'endpoint="{key[0]}",encoding="{key[1]}"',
+        )
+        histogram(
+            "sonarr_model_parse_duration_seconds",
+            "Duration of building models from API responses.",
+            self.parse_durations,
+            lambda key: f'endpoint="{key}"',
+        )
+        counter(
+            "sonarr_models_parsed_total",
+            "Models built from API responses.",
+            self.parsed_models,
+            lambda key: f'endpoint="{key}"',
+        )
+
+        return "\n".join(lines) + "\n"
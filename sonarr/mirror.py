@@ -0,0 +1,237 @@
+"""Persistent local mirror of a Sonarr library."""
+import asyncio
+import json
+import logging
+import sqlite3
+from contextlib import closing
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .exceptions import SonarrError
+from .limiter import PRIORITY_BACKGROUND
+from .models import Application, LazySeriesItem, SeriesItem
+from .sonarr import Sonarr
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS application (
+    section TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync (id INTEGER PRIMARY KEY, time REAL NOT NULL);
+"""
+
+
+class LibraryMirror:
+    """Mirror series and application information in a local SQLite file.
+
+    Mirrored data is served as soon as it is loaded from the file, while
+    refreshes from Sonarr run in the background and only rewrite the series
+    records that changed. Seasons are stored with their series, as in the
+    API response. The file uses write-ahead logging so several processes
+    can read it while one refreshes.
+    """
+
+    def __init__(
+        self, sonarr: Sonarr, path: str, refresh_interval: float = 300.0
+    ) -> None:
+        """Initialize mirror backed by the SQLite file at path."""
+        self.sonarr = sonarr
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.synced: Optional[float] = None
+        self._payloads: Dict[int, dict] = {}
+        self._series: Optional[List[SeriesItem]] = None
+        self._application: Optional[Application] = None
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def app(self) -> Optional[Application]:
+        """Return the mirrored Application object."""
+        return self._application
+
+    def series(self, lazy: bool = False) -> List[Union[SeriesItem, LazySeriesItem]]:
+        """Return all mirrored series.
+
+        If lazy is set, lightweight proxies are returned which only
+        materialize fields from the mirrored payload when first accessed.
+        """
+        if lazy:
+            return [LazySeriesItem(result) for result in self._payloads.values()]
+
+        if self._series is None:
+            self._series = [
+                SeriesItem.from_dict(result) for result in self._payloads.values()
+            ]
+
+        return self._series
+
+    async def load(self) -> bool:
+        """Load mirrored data from the file and return if any was found.
+
+        The Application object is also handed to the Sonarr client, so
+        that update() only refreshes disk space.
+        """
+        loop = asyncio.get_event_loop()
+        synced, series, sections = await loop.run_in_executor(None, self._read)
+
+        if synced is None:
+            return False
+
+        self.synced = synced
+        self._payloads = {result.get("id", 0): result for result in series}
+        self._series = None
+
+        if sections.get("info", None):
+            # Mirrored disk space is not recorded as a fresh history sample.
+            self._application = Application(sections)
+            self._application.history_size = self.sonarr.disk_history
+            if self.sonarr._application is None:
+                self.sonarr._application = self._application
+
+        return True
+
+    async def refresh(self) -> None:
+        """Fetch series and application information and store the changes."""
+        sections = await self.sonarr._request_all(
+            {"series": "series", **self.sonarr.full_update_sections},
+            priority=PRIORITY_BACKGROUND,
+        )
+        series = sections.pop("series")
+
+        if sections.get("info", None) is None:
+            raise SonarrError("Sonarr returned an empty API status response")
+
+        payloads = {result.get("id", 0): result for result in series}
+        changed = [
+            (series_id, result)
+            for series_id, result in payloads.items()
+            if self._payloads.get(series_id, None) != result
+        ]
+        removed = [
+            series_id for series_id in self._payloads if series_id not in payloads
+        ]
+
+        synced = time()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None, self._write, synced, changed, removed, sections
+        )
+
+        self.synced = synced
+        self._payloads = payloads
+        if changed or removed:
+            self._series = None
+
+        # Share one Application with the client, keeping the disk history
+        # it recorded itself.
+        application = self.sonarr._application or self._application
+        if application is None or not self.sonarr.disk_history:
+            application = Application(sections, self.sonarr.disk_history)
+        else:
+            application.update_from_dict(sections)
+
+        self._application = self.sonarr._application = application
+
+    def start(self) -> None:
+        """Refresh the mirror in the background every refresh_interval seconds.
+
+        Failed refreshes are logged and retried on the next interval, while
+        mirrored data keeps being served.
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop refreshing the mirror in the background."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        self._task = None
+
+    async def _refresh_loop(self) -> None:
+        """Refresh the mirror until cancelled, logging failed refreshes."""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except SonarrError as exception:
+                _LOGGER.warning("Error refreshing mirror %s: %s", self.path, exception)
+            # Keep the mirror refreshing whatever went wrong this time.
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected error refreshing mirror %s", self.path)
+
+            await asyncio.sleep(self.refresh_interval)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the mirror file, creating its tables."""
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _read(self) -> Tuple[Optional[float], List[dict], Dict[str, Any]]:
+        """Return the sync time, series and application sections in the file."""
+        json_loads: Callable[[str], Any] = self.sonarr.json_loads
+
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT time FROM sync WHERE id = 0").fetchone()
+            series = [
+                json_loads(data)
+                for (data,) in connection.execute("SELECT data FROM series")
+            ]
+            sections = {
+                section: json_loads(data)
+                for section, data in connection.execute(
+                    "SELECT section, data FROM application"
+                )
+            }
+
+        return (row[0] if row else None), series, sections
+
+    def _write(
+        self,
+        synced: float,
+        changed: List[Tuple[int, dict]],
+        removed: List[int],
+        sections: Dict[str, Any],
+    ) -> None:
+        """Store changed and removed series and application sections."""
+        with closing(self._connect()) as connection:
+            # The connection commits the writes as one transaction.
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO series (id, data) VALUES (?, ?)",
+                    [(series_id, json.dumps(result)) for series_id, result in changed],
+                )
+                connection.executemany(
+                    "DELETE FROM series WHERE id = ?",
+                    [(series_id,) for series_id in removed],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO application (section, data) VALUES (?, ?)",
+                    [(section, json.dumps(data)) for section, data in sections.items()],
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO sync (id, time) VALUES (0, ?)", (synced,)
+                )
+
+    async def __aenter__(self) -> "LibraryMirror":
+        """Async enter, loading the mirror and refreshing it in the background."""
+        await self.load()
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Async exit."""
+        await self.stop()
@@ -1,14 +1,54 @@
 """Models for Sonarr."""
 
-from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from dataclasses import FrozenInstanceError, dataclass, fields
+from datetime import datetime, timezone
+from functools import lru_cache
+from time import time
+from typing import Any, Callable, ClassVar, Dict, List, Optional
 
+from .const import DT_CACHE_SIZE
 from .exceptions import SonarrError
+from .history import DiskHistory
 
 
-def dt_str_to_dt(dt_str: str) -> datetime:
-    """Convert ISO-8601 datetime string to datetime object."""
+def slotted(cls: type) -> type:
+    """Return a copy of a frozen dataclass storing its fields in __slots__.
+
+    Equivalent to dataclass(slots=True), which is only available on
+    Python 3.10 and newer.
+    """
+    names = tuple(field.name for field in fields(cls))
+
+    namespace = dict(cls.__dict__)
+    for name in names + ("__dict__", "__weakref__"):
+        namespace.pop(name, None)
+
+    def __getstate__(self) -> list:
+        return [getattr(self, name) for name in names]
+
+    def __setstate__(self, state: list) -> None:
+        for name, value in zip(names, state):
+            object.__setattr__(self, name, value)
+
+    # The dataclass versions refer to the original class.
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    # Plain dataclasses support weak references, so keep a slot for them.
+    namespace["__slots__"] = names + ("__weakref__",)
+    namespace["__getstate__"] = __getstate__
+    namespace["__setstate__"] = __setstate__
+    namespace["__setattr__"] = __setattr__
+    namespace["__delattr__"] = __delattr__
+
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+def _dt_str_to_dt_strptime(dt_str: str) -> datetime:
+    """Convert ISO-8601 datetime string to datetime object using strptime."""
     utc = False
 
     if "Z" in dt_str:
@@ -30,6 +70,65 @@ def dt_str_to_dt(dt_str: str) -> datetime:
     return datetime.strptime(dt_str, fmt)
 
 
+def _dt_str_to_dt_fast(dt_str: str) -> datetime:
+    """Convert ISO-8601 datetime string to datetime object using fromisoformat.
+
+    Handles the layouts Sonarr emits (optional fraction of up to 7 digits and
+    an optional "Z" suffix), keeping the same centisecond precision as the
+    strptime path. Anything else is handed over to the strptime path.
+    """
+    utc = dt_str[-1:] == "Z"
+    if utc:
+        dt_str = dt_str[:-1]
+
+    base, sep, fraction = dt_str.partition(".")
+    if len(base) != 19 or base[10] != "T" or (sep and not fraction.isdigit()):
+        return _dt_str_to_dt_strptime(dt_str + "Z" if utc else dt_str)
+
+    try:
+        value = datetime.fromisoformat(base)
+    except ValueError:
+        return _dt_str_to_dt_strptime(dt_str + "Z" if utc else dt_str)
+
+    if fraction:
+        value = value.replace(microsecond=int(fraction[:2].ljust(6, "0")))
+
+    if utc:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return value
+
+
+@lru_cache(maxsize=DT_CACHE_SIZE)
+def dt_str_to_dt(dt_str: str) -> datetime:
+    """Convert ISO-8601 datetime string to datetime object."""
+    return _dt_str_to_dt_fast(dt_str)
+
+
+def optional_dt(dt_str: Optional[str]) -> Optional[datetime]:
+    """Convert optional ISO-8601 datetime string to datetime object."""
+    if dt_str is None:
+        return None
+
+    return dt_str_to_dt(dt_str)
+
+
+def series_poster(data: dict) -> Optional[str]:
+    """Return the poster URL from a series Sonarr API response."""
+    poster = None
+    for image in data.get("images", []):
+        if "poster" not in image["coverType"]:
+            continue
+
+        if "remoteUrl" in image:
+            poster = image["remoteUrl"]
+        else:
+            poster = image["url"]
+
+    return poster
+
+
+@slotted
 @dataclass(frozen=True)
 class Disk:
     """Object holding disk information from Sonarr."""
@@ -50,6 +149,7 @@ class Disk:
         )
 
 
+@slotted
 @dataclass(frozen=True)
 class Season:
     """Object holding season information from Sonarr."""
@@ -78,6 +178,33 @@ class Season:
         )
 
 
+# Field values of the models read from a Sonarr API response, shared by
+# from_dict and the lazy proxies.
+SERIES_FIELDS: Dict[str, Callable[[dict], Any]] = {
+    "tvdb_id": lambda data: data.get("tvdbId", 0),
+    "series_id": lambda data: data.get("id", 0),
+    "series_type": lambda data: data.get("seriesType", "unknown"),
+    "slug": lambda data: data.get("titleSlug", ""),
+    "status": lambda data: data.get("status", "unknown"),
+    "title": lambda data: data.get("title", ""),
+    "seasons": lambda data: data.get("seasonCount", 0),
+    "overview": lambda data: data.get("overview", ""),
+    "certification": lambda data: data.get("certification", "None"),
+    "genres": lambda data: data.get("genres", []),
+    "network": lambda data: data.get("network", "Unknown"),
+    "runtime": lambda data: data.get("runtime", 0),
+    "timeslot": lambda data: data.get("airTime", ""),
+    "year": lambda data: data.get("year", 0),
+    "premiere": lambda data: optional_dt(data.get("firstAired", None)),
+    "path": lambda data: data.get("path", ""),
+    "poster": series_poster,
+    "monitored": lambda data: data.get("monitored", False),
+    "added": lambda data: optional_dt(data.get("added", None)),
+    "synced": lambda data: optional_dt(data.get("lastInfoSync", None)),
+}
+
+
+@slotted
 @dataclass(frozen=True)
 class Series:
     """Object holding series information from Sonarr."""
@@ -106,52 +233,47 @@ class Series:
     @staticmethod
     def from_dict(data: dict):
         """Return Series object from Sonarr API response."""
-        premiere = data.get("firstAired", None)
-        if premiere is not None:
-            premiere = dt_str_to_dt(premiere)
-
-        added = data.get("added", None)
-        if added is not None:
-            added = dt_str_to_dt(added)
-
-        synced = data.get("lastInfoSync", None)
-        if synced is not None:
-            synced = dt_str_to_dt(synced)
-
-        poster = None
-        for image in data.get("images", []):
-            if "poster" not in image["coverType"]:
-                continue
-
-            if "remoteUrl" in image:
-                poster = image["remoteUrl"]
-            else:
-                poster = image["url"]
-
-        return Series(
-            tvdb_id=data.get("tvdbId", 0),
-            series_id=data.get("id", 0),
-            series_type=data.get("seriesType", "unknown"),
-            slug=data.get("titleSlug", ""),
-            status=data.get("status", "unknown"),
-            title=data.get("title", ""),
-            seasons=data.get("seasonCount", 0),
-            overview=data.get("overview", ""),
-            certification=data.get("certification", "None"),
-            genres=data.get("genres", []),
-            network=data.get("network", "Unknown"),
-            runtime=data.get("runtime", 0),
-            timeslot=data.get("airTime", ""),
-            year=data.get("year", 0),
-            premiere=premiere,
-            path=data.get("path", ""),
-            poster=poster,
-            added=added,
-            synced=synced,
-            monitored=data.get("monitored", False),
-        )
-
-
+        return Series(**{name: field(data) for name, field in SERIES_FIELDS.items()})
+
+
+def intern_series(
+    data: dict, series_cache: Optional[Dict[int, Series]] = None
+) -> Series:
+    """Return Series object from Sonarr API response, reusing cached objects.
+
+    The cache is keyed by series id and should be scoped to a single
+    response, in which all payloads for a series id are identical.
+    """
+    series_id = data.get("id", None)
+    if series_cache is None or series_id is None:
+        return Series.from_dict(data)
+
+    series = series_cache.get(series_id, None)
+    if series is None:
+        series = series_cache[series_id] = Series.from_dict(data)
+
+    return series
+
+
+# The series field of episodes is not included, as it is interned.
+EPISODE_FIELDS: Dict[str, Callable[[dict], Any]] = {
+    "tvdb_id": lambda data: data.get("tvDbEpisodeId", 0),
+    "episode_id": lambda data: data.get("id", 0),
+    "episode_number": lambda data: data.get("episodeNumber", 0),
+    "season_number": lambda data: data.get("seasonNumber", 0),
+    "identifier": lambda data: "S{:02d}E{:02d}".format(
+        data.get("seasonNumber", 0), data.get("episodeNumber", 0)
+    ),
+    "title": lambda data: data.get("title", ""),
+    "overview": lambda data: data.get("overview", ""),
+    "airdate": lambda data: data.get("airDate", ""),
+    "airs": lambda data: optional_dt(data.get("airDateUtc", None)),
+    "downloaded": lambda data: data.get("hasFile", False),
+    "downloading": lambda data: data.get("downloading", False),
+}
+
+
+@slotted
 @dataclass(frozen=True)
 class Episode:
     """Object holding episode information from Sonarr."""
@@ -170,32 +292,18 @@ class Episode:
     series: Series
 
     @staticmethod
-    def from_dict(data: dict):
-        """Return Episode object from Sonarr API response."""
-        airs = data.get("airDateUtc", None)
-        if airs is not None:
-            airs = dt_str_to_dt(airs)
-
-        episode_number = data.get("episodeNumber", 0)
-        season_number = data.get("seasonNumber", 0)
-        identifier = f"S{season_number:02d}E{episode_number:02d}"
+    def from_dict(data: dict, series_cache: Optional[Dict[int, Series]] = None):
+        """Return Episode object from Sonarr API response.
 
+        Episodes sharing a series_cache share one Series object per series id.
+        """
         return Episode(
-            tvdb_id=data.get("tvDbEpisodeId", 0),
-            episode_id=data.get("id", 0),
-            episode_number=episode_number,
-            season_number=season_number,
-            identifier=identifier,
-            title=data.get("title", ""),
-            overview=data.get("overview", ""),
-            airdate=data.get("airDate", ""),
-            airs=airs,
-            downloaded=data.get("hasFile", False),
-            downloading=data.get("downloading", False),
-            series=Series.from_dict(data.get("series", {})),
+            series=intern_series(data.get("series", {}), series_cache),
+            **{name: field(data) for name, field in EPISODE_FIELDS.items()},
         )
 
 
+@slotted
 @dataclass(frozen=True)
 class Info:
     """Object holding information from Sonarr."""
@@ -209,6 +317,7 @@ class Info:
         return Info(app_name="Sonarr", version=data.get("version", "Unknown"))
 
 
+@slotted
 @dataclass(frozen=True)
 class CommandItem:
     """Object holding command item information from Sonarr."""
@@ -261,6 +370,7 @@ class CommandItem:
         )
 
 
+@slotted
 @dataclass(frozen=True)
 class QueueItem:
     """Object holding queue item information from Sonarr."""
@@ -278,12 +388,11 @@ class QueueItem:
     time_remaining: str
 
     @staticmethod
-    def from_dict(data: dict):
+    def from_dict(data: dict, series_cache: Optional[Dict[int, Series]] = None):
         """Return QueueItem object from Sonarr API response."""
-        episode_data = data.get("episode", {})
-        episode_data["series"] = data.get("series", {})
-
-        episode = Episode.from_dict(episode_data)
+        # The payload may be shared with the response cache, so copy it.
+        episode_data = {**data.get("episode", {}), "series": data.get("series", {})}
+        episode = Episode.from_dict(episode_data, series_cache)
 
         eta = data.get("estimatedCompletionTime", None)
         if eta is not None:
@@ -304,6 +413,20 @@ class QueueItem:
         )
 
 
+# The series field of series items is not included, as it is built from the
+# same response.
+SERIES_ITEM_FIELDS: Dict[str, Callable[[dict], Any]] = {
+    "seasons": lambda data: [
+        Season.from_dict(season) for season in data.get("seasons", [])
+    ],
+    "downloaded": lambda data: data.get("episodeFileCount", 0),
+    "episodes": lambda data: data.get("episodeCount", 0),
+    "total_episodes": lambda data: data.get("totalEpisodeCount", 0),
+    "diskspace": lambda data: data.get("sizeOnDisk", 0),
+}
+
+
+@slotted
 @dataclass(frozen=True)
 class SeriesItem:
     """Object holding series item information from Sonarr."""
@@ -318,18 +441,13 @@ class SeriesItem:
     @staticmethod
     def from_dict(data: dict):
         """Return QueueItem object from Sonarr API response."""
-        seasons = [Season.from_dict(season) for season in data.get("seasons", [])]
-
         return SeriesItem(
             series=Series.from_dict(data),
-            seasons=seasons,
-            downloaded=data.get("episodeFileCount", 0),
-            episodes=data.get("episodeCount", 0),
-            total_episodes=data.get("totalEpisodeCount", 0),
-            diskspace=data.get("sizeOnDisk", 0),
+            **{name: field(data) for name, field in SERIES_ITEM_FIELDS.items()},
         )
 
 
+@slotted
 @dataclass(frozen=True)
 class WantedResults:
     """Object holding wanted episode results from Sonarr."""
@@ -342,9 +460,16 @@ class WantedResults:
     episodes: List[Episode]
 
     @staticmethod
-    def from_dict(data: dict):
+    def from_dict(data: dict, lazy: bool = False):
         """Return WantedResults object from Sonarr API response."""
-        episodes = [Episode.from_dict(episode) for episode in data.get("records", [])]
+        if lazy:
+            episodes = [LazyEpisode(episode) for episode in data.get("records", [])]
+        else:
+            series_cache: Dict[int, Series] = {}
+            episodes = [
+                Episode.from_dict(episode, series_cache)
+                for episode in data.get("records", [])
+            ]
 
         return WantedResults(
             page=data.get("page", 0),
@@ -356,17 +481,63 @@ class WantedResults:
         )
 
 
+@slotted
+@dataclass(frozen=True)
+class Event:
+    """Object holding a pushed event from Sonarr."""
+
+    name: str
+    action: str
+    resource: Any
+
+    models: ClassVar[Dict[str, Callable[[dict], Any]]] = {
+        "calendar": Episode.from_dict,
+        "command": CommandItem.from_dict,
+        "episode": Episode.from_dict,
+        "queue": QueueItem.from_dict,
+        "series": SeriesItem.from_dict,
+    }
+
+    @staticmethod
+    def from_dict(data: dict):
+        """Return Event object from a Sonarr SignalR message.
+
+        Resources of known events are decoded into their models, others are
+        kept as the raw dict. Events without a resource, such as a queue
+        sync, have a resource of None.
+        """
+        name = data.get("name", "unknown")
+        body = data.get("body", None) or {}
+        resource = body.get("resource", None)
+
+        model = Event.models.get(name, None)
+        if resource and model is not None:
+            resource = model(resource)
+
+        return Event(
+            name=name,
+            action=body.get("action", "unknown"),
+            resource=resource,
+        )
+
+
 class Application:
     """Object holding all information of the Sonarr Application."""
 
     info: Info
     disks: List[Disk] = []
 
-    def __init__(self, data: dict):
-        """Initialize an empty Sonarr application class."""
+    def __init__(self, data: dict, history_size: int = 0):
+        """Initialize an empty Sonarr application class.
+
+        If history_size is set, up to that many samples of the disk space of
+        each disk are kept in history, keyed by path.
+        """
         # Check if all elements are in the passed dict, else raise an Error
         if any(k not in data for k in ["info"]):
             raise SonarrError("Sonarr data is incomplete, cannot construct object")
+        self.history_size = history_size
+        self.history: Dict[str, DiskHistory] = {}
         self.update_from_dict(data)
 
     def update_from_dict(self, data: dict) -> "Application":
@@ -378,4 +549,98 @@ class Application:
             disks = [Disk.from_dict(disk) for disk in data["diskspace"]]
             self.disks = disks
 
+            if self.history_size:
+                self._record_history(disks)
+
         return self
+
+    def _record_history(self, disks: List[Disk]) -> None:
+        """Record the disk space of each disk in its history."""
+        timestamp = time()
+
+        for disk in disks:
+            history = self.history.get(disk.path, None)
+            if history is None:
+                history = self.history[disk.path] = DiskHistory(self.history_size)
+
+            history.record(timestamp, disk.free, disk.total)
+
+
+class LazyModel:
+    """Proxy materializing model fields from a Sonarr API response on access."""
+
+    __slots__ = ("_data", "_cache")
+
+    model: Any = None
+    fields: Dict[str, Callable[[dict], Any]] = {}
+
+    def __init__(self, data: dict) -> None:
+        """Initialize proxy from a raw Sonarr API response."""
+        self._data = data
+        self._cache: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        """Return the field value, materializing and caching it on first use."""
+        if name.startswith("_"):
+            # Unset slots of instances not built by __init__, such as copies.
+            raise AttributeError(name)
+
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        try:
+            resolver = self.fields[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
+        value = self._cache[name] = resolver(self._data)
+        return value
+
+    def __repr__(self) -> str:
+        """Return representation of the proxy."""
+        return f"{type(self).__name__}({self.materialize()!r})"
+
+    def materialize(self) -> Any:
+        """Return the fully constructed model object."""
+        values = {}
+        for name in self.fields:
+            value = getattr(self, name)
+            if isinstance(value, LazyModel):
+                value = value.materialize()
+            values[name] = value
+
+        return self.model(**values)
+
+
+class LazySeries(LazyModel):
+    """Lazy proxy for Series information from Sonarr."""
+
+    __slots__ = ()
+
+    model = Series
+    fields = SERIES_FIELDS
+
+
+class LazyEpisode(LazyModel):
+    """Lazy proxy for Episode information from Sonarr."""
+
+    __slots__ = ()
+
+    model = Episode
+    fields = {
+        **EPISODE_FIELDS,
+        "series": lambda data: LazySeries(data.get("series", {})),
+    }
+
+
+class LazySeriesItem(LazyModel):
+    """Lazy proxy for SeriesItem information from Sonarr."""
+
+    __slots__ = ()
+
+    model = SeriesItem
+    fields = {"series": LazySeries, **SERIES_ITEM_FIELDS}
@@ -0,0 +1,25 @@
+"""Optional dependencies for Sonarr, imported on first use."""
+from functools import lru_cache
+from typing import Any
+
+
+@lru_cache(maxsize=None)
+def import_numpy() -> Any:
+    """Return the numpy module, or None if it is not installed."""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover
+        return None
+
+    return numpy
+
+
+@lru_cache(maxsize=None)
+def import_pyarrow() -> Any:
+    """Return the pyarrow module, or None if it is not installed."""
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover
+        return None
+
+    return pyarrow
@@ -0,0 +1,116 @@
+"""Retry policy and circuit breaker for Sonarr."""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import random
+from time import monotonic
+from typing import Collection, Optional
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds requested by a Retry-After header."""
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """Retry idempotent requests with jittered exponential backoff.
+
+    Requests are retried on connection errors and on the given response
+    statuses, up to attempts tries in total. A Retry-After header sent by
+    the API is honoured, and the request is not retried when it asks for a
+    longer wait than max_backoff.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        jitter: float = 0.5,
+        statuses: Collection[int] = RETRY_STATUSES,
+        methods: Collection[str] = ("GET",),
+    ) -> None:
+        """Initialize retry policy."""
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """Return the delay before retrying a failed attempt, or None to give up."""
+        if attempt >= self.attempts:
+            return None
+
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            return requested if requested <= self.max_backoff else None
+
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return delay * (1 - self.jitter * random())
+
+
+class CircuitBreaker:
+    """Fail fast while an API keeps failing.
+
+    The circuit opens after failure_threshold consecutive failures. Once
+    recovery_timeout seconds have passed a single trial request is let
+    through, closing the circuit on success and reopening it on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        """Initialize a closed circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self._opened: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return if requests are currently failing fast."""
+        if self._opened is None:
+            return False
+
+        return monotonic() - self._opened < self.recovery_timeout
+
+    def allow(self) -> bool:
+        """Return if a request may be sent."""
+        if self._opened is None:
+            return True
+
+        if monotonic() - self._opened < self.recovery_timeout:
+            return False
+
+        # Let one trial request through per recovery timeout.
+        self._opened = monotonic()
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit."""
+        self.failures = 0
+        self._opened = None
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit at the threshold."""
+        self.failures += 1
+
+        if self._opened is not None or self.failures >= self.failure_threshold:
+            self._opened = monotonic()
@@ -0,0 +1,29 @@
+"""SignalR protocol helpers for Sonarr."""
+import json
+from typing import Any, Callable, List, Mapping
+
+HUB_PATH = "signalr/messages"
+RECORD_SEPARATOR = "\x1e"
+
+HANDSHAKE = {"protocol": "json", "version": 1}
+
+MESSAGE_INVOCATION = 1
+MESSAGE_PING = 6
+MESSAGE_CLOSE = 7
+
+# Seconds between keep-alive pings sent to the hub, and without any message
+# from the hub before the connection is considered lost.
+PING_INTERVAL = 15.0
+SERVER_TIMEOUT = 30.0
+
+
+def encode_message(message: Mapping[str, Any]) -> str:
+    """Return a message framed for the SignalR JSON hub protocol."""
+    return json.dumps(message, separators=(",", ":")) + RECORD_SEPARATOR
+
+
+def decode_messages(
+    text: str, json_loads: Callable[[str], Any] = json.loads
+) -> List[dict]:
+    """Return the messages framed in a SignalR JSON hub protocol frame."""
+    return [json_loads(record) for record in text.split(RECORD_SEPARATOR) if record]
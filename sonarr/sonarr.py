@@ -1,18 +1,48 @@
 """Asynchronous Python client for Sonarr."""
-from typing import List, Optional
+import asyncio
+from collections import deque
+from math import ceil
+from time import monotonic, perf_counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Union,
+)
 
 from aiohttp.client import ClientSession
 
-from .client import Client
-from .exceptions import SonarrError
+from .cache import ResponseCache
+from .client import Client, JSONLoads
+from .columnar import SeriesColumns
+from .exceptions import SonarrConnectionError, SonarrError
+from .limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_NORMAL,
+    RequestLimiter,
+)
+from .metrics import RequestObserver
 from .models import (
     Application,
     CommandItem,
     Episode,
+    Event,
+    LazySeriesItem,
     QueueItem,
+    Series,
     SeriesItem,
     WantedResults,
 )
+from .retry import CircuitBreaker, RetryPolicy
+
+COMMAND_FINISHED_STATES = ("aborted", "cancelled", "completed", "failed", "orphaned")
 
 
 class Sonarr(Client):
@@ -20,6 +50,14 @@ class Sonarr(Client):
 
     _application: Optional[Application] = None
 
+    # Application sections and the API endpoints they are fetched from,
+    # requested concurrently on full and partial updates respectively.
+    full_update_sections: Mapping[str, str] = {
+        "info": "system/status",
+        "diskspace": "diskspace",
+    }
+    update_sections: Mapping[str, str] = {"diskspace": "diskspace"}
+
     def __init__(
         self,
         host: str,
@@ -30,9 +68,26 @@ class Sonarr(Client):
         session: ClientSession = None,
         tls: bool = False,
         verify_ssl: bool = True,
-        user_agent: str = None,
+        user_agent: Optional[str] = None,
+        json_loads: Optional[JSONLoads] = None,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        cache: Optional[ResponseCache] = None,
+        coalesce_requests: bool = False,
+        observers: Optional[List[RequestObserver]] = None,
+        retry: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[RequestLimiter] = None,
+        compression: bool = True,
+        disk_history: int = 0,
     ) -> None:
-        """Initialize connection with Sonarr."""
+        """Initialize connection with Sonarr.
+
+        If disk_history is set, up to that many disk space samples per disk
+        are kept in the history of the Application object.
+        """
         super().__init__(
             host=host,
             api_key=api_key,
@@ -43,7 +98,20 @@ class Sonarr(Client):
             tls=tls,
             verify_ssl=verify_ssl,
             user_agent=user_agent,
+            json_loads=json_loads,
+            connection_limit=connection_limit,
+            connection_limit_per_host=connection_limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            dns_cache_ttl=dns_cache_ttl,
+            cache=cache,
+            coalesce_requests=coalesce_requests,
+            observers=observers,
+            retry=retry,
+            circuit_breaker=circuit_breaker,
+            limiter=limiter,
+            compression=compression,
         )
+        self.disk_history = disk_history
 
     @property
     def app(self) -> Optional[Application]:
@@ -53,25 +121,78 @@ class Sonarr(Client):
     async def update(self, full_update: bool = False) -> Application:
         """Get all information about the application in a single call."""
         if self._application is None or full_update:
-            status = await self._request("system/status")
-            if status is None:
+            data = await self._request_all(self.full_update_sections)
+            if data.get("info", None) is None:
                 raise SonarrError("Sonarr returned an empty API status response")
 
-            diskspace = await self._request("diskspace")
+            if self._application is None or not self.disk_history:
+                self._application = Application(data, self.disk_history)
+            else:
+                # Keep the recorded disk history.
+                self._application.update_from_dict(data)
 
-            self._application = Application({"info": status, "diskspace": diskspace})
             return self._application
 
-        diskspace = await self._request("diskspace")
-        self._application.update_from_dict({"diskspace": diskspace})
+        data = await self._request_all(self.update_sections)
+        self._application.update_from_dict(data)
         return self._application
 
+    async def _request_all(
+        self, uris: Mapping[str, str], priority: int = PRIORITY_NORMAL
+    ) -> Dict[str, Any]:
+        """Request several API endpoints concurrently.
+
+        If any request fails, the remaining requests are cancelled and the
+        error is raised.
+        """
+        tasks = {
+            key: asyncio.ensure_future(self._request(uri, priority=priority))
+            for key, uri in uris.items()
+        }
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return {key: task.result() for key, task in tasks.items()}
+
     async def calendar(self, start: str = None, end: str = None) -> List[Episode]:
         """Get upcoming episodes.
 
         If start/end are not supplied, episodes airing
         today and tomorrow will be returned.
         """
+        results = await self._request(
+            "calendar", params=self._calendar_params(start, end)
+        )
+
+        parse_start = perf_counter()
+        series_cache: Dict[int, Series] = {}
+        episodes = [Episode.from_dict(result, series_cache) for result in results]
+        self._observe_parse("calendar", parse_start, len(episodes))
+
+        return episodes
+
+    async def iter_calendar(
+        self, start: str = None, end: str = None
+    ) -> AsyncIterator[Episode]:
+        """Yield upcoming episodes as they are decoded from the response."""
+        series_cache: Dict[int, Series] = {}
+        params = self._calendar_params(start, end)
+
+        stream = self._stream_request("calendar", params=params)
+        try:
+            async for result in stream:
+                yield Episode.from_dict(result, series_cache)
+        finally:
+            await stream.aclose()
+
+    @staticmethod
+    def _calendar_params(start: Optional[str], end: Optional[str]) -> Dict[str, str]:
+        """Return query parameters for calendar requests."""
         params = {}
 
         if start is not None:
@@ -80,33 +201,176 @@ class Sonarr(Client):
         if end is not None:
             params["end"] = str(end)
 
-        results = await self._request("calendar", params=params)
-
-        return [Episode.from_dict(result) for result in results]
+        return params
 
     async def commands(self) -> List[CommandItem]:
         """Query the status of all currently started commands."""
         results = await self._request("command")
 
-        return [CommandItem.from_dict(result) for result in results]
+        start = perf_counter()
+        commands = [CommandItem.from_dict(result) for result in results]
+        self._observe_parse("command", start, len(commands))
+
+        return commands
 
     async def command_status(self, command_id: int) -> CommandItem:
         """Query the status of a previously started command."""
-        result = await self._request(f"command/{command_id}")
+        result = await self._request(
+            f"command/{command_id}", priority=PRIORITY_INTERACTIVE
+        )
+
+        start = perf_counter()
+        command = CommandItem.from_dict(result)
+        self._observe_parse(f"command/{command_id}", start, 1)
+
+        return command
+
+    async def wait_for_command(
+        self,
+        command_ids: Union[int, Iterable[int]],
+        timeout: float = 300,
+        interval: float = 0.5,
+        max_interval: float = 10.0,
+        concurrency: int = 4,
+    ) -> Dict[int, CommandItem]:
+        """Wait until previously started commands have finished.
+
+        All commands are tracked with a single query of the started commands
+        per tick. Commands no longer listed are queried individually, with at
+        most concurrency queries at a time, and only once until they are
+        listed again. The interval between ticks doubles up to max_interval.
+        Returns the finished commands by id.
+        """
+        if concurrency < 1:
+            raise SonarrError("At least one command must be queried at a time")
+
+        if isinstance(command_ids, int):
+            command_ids = [command_ids]
+
+        pending = set(command_ids)
+        looked_up: Set[int] = set()
+        finished: Dict[int, CommandItem] = {}
+        deadline = monotonic() + timeout
+        semaphore = asyncio.Semaphore(concurrency)
 
-        return CommandItem.from_dict(result)
+        async def command_status(command_id: int) -> CommandItem:
+            async with semaphore:
+                return await self.command_status(command_id)
+
+        while True:
+            listed = {command.command_id: command for command in await self.commands()}
+            looked_up.difference_update(listed)
+
+            missing = [
+                command_id
+                for command_id in pending
+                if command_id not in listed and command_id not in looked_up
+            ]
+            tasks = [
+                asyncio.ensure_future(command_status(command_id))
+                for command_id in missing
+            ]
+
+            try:
+                statuses = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+            looked_up.update(missing)
+            listed.update(zip(missing, statuses))
+
+            for command_id in list(pending):
+                command = listed.get(command_id, None)
+                if command is not None and command.state in COMMAND_FINISHED_STATES:
+                    finished[command_id] = command
+                    pending.discard(command_id)
+
+            if not pending:
+                return finished
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise SonarrError(
+                    "Timeout occurred while waiting for commands to finish",
+                    sorted(pending),
+                )
+
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
 
     async def queue(self) -> List[QueueItem]:
         """Get currently downloading info."""
         results = await self._request("queue")
 
-        return [QueueItem.from_dict(result) for result in results]
+        start = perf_counter()
+        series_cache: Dict[int, Series] = {}
+        items = [QueueItem.from_dict(result, series_cache) for result in results]
+        self._observe_parse("queue", start, len(items))
+
+        return items
 
-    async def series(self) -> List[SeriesItem]:
-        """Return all series."""
-        results = await self._request("series")
+    async def iter_queue(self) -> AsyncIterator[QueueItem]:
+        """Yield currently downloading info as it is decoded from the response."""
+        series_cache: Dict[int, Series] = {}
 
-        return [SeriesItem.from_dict(result) for result in results]
+        stream = self._stream_request("queue")
+        try:
+            async for result in stream:
+                yield QueueItem.from_dict(result, series_cache)
+        finally:
+            await stream.aclose()
+
+    async def series(
+        self, lazy: bool = False
+    ) -> List[Union[SeriesItem, LazySeriesItem]]:
+        """Return all series.
+
+        If lazy is set, lightweight proxies are returned which only
+        materialize fields from the API response when first accessed.
+        """
+        results = await self._request("series", priority=PRIORITY_BACKGROUND)
+
+        if lazy:
+            return [LazySeriesItem(result) for result in results]
+
+        start = perf_counter()
+        items = [SeriesItem.from_dict(result) for result in results]
+        self._observe_parse("series", start, len(items))
+
+        return items
+
+    async def iter_series(
+        self, lazy: bool = False
+    ) -> AsyncIterator[Union[SeriesItem, LazySeriesItem]]:
+        """Yield all series as they are decoded from the response.
+
+        Only one series payload needs to be held in memory at a time.
+        """
+        stream = self._stream_request("series", priority=PRIORITY_BACKGROUND)
+        try:
+            async for result in stream:
+                if lazy:
+                    yield LazySeriesItem(result)
+                else:
+                    yield SeriesItem.from_dict(result)
+        finally:
+            await stream.aclose()
+
+    async def series_columns(self) -> SeriesColumns:
+        """Return all series and seasons as columns for library analytics.
+
+        The columns are built from the API response without creating a
+        model object per series.
+        """
+        results = await self._request("series", priority=PRIORITY_BACKGROUND)
+
+        start = perf_counter()
+        columns = SeriesColumns(results)
+        self._observe_parse("series", start, len(columns))
+
+        return columns
 
     async def wanted(
         self,
@@ -114,8 +378,13 @@ class Sonarr(Client):
         page: int = 1,
         page_size: int = 10,
         sort_dir: str = "desc",
+        lazy: bool = False,
     ) -> WantedResults:
-        """Get wanted missing episodes."""
+        """Get wanted missing episodes.
+
+        If lazy is set, the episodes are lightweight proxies which only
+        materialize fields from the API response when first accessed.
+        """
         params = {
             "sortKey": sort_key,
             "page": str(page),
@@ -125,7 +394,103 @@ class Sonarr(Client):
 
         results = await self._request("wanted/missing", params=params)
 
-        return WantedResults.from_dict(results)
+        start = perf_counter()
+        wanted = WantedResults.from_dict(results, lazy=lazy)
+        self._observe_parse("wanted/missing", start, len(wanted.episodes))
+
+        return wanted
+
+    async def iter_wanted(
+        self,
+        sort_key: str = "airDateUtc",
+        page_size: int = 250,
+        sort_dir: str = "desc",
+        concurrency: int = 4,
+    ) -> AsyncIterator[Episode]:
+        """Yield all wanted missing episodes, fetching pages as needed.
+
+        The total from the first page is used to fetch the remaining pages
+        concurrently, with at most concurrency pages requested or buffered
+        at a time. Episodes are yielded in sort order.
+        """
+        if concurrency < 1:
+            raise SonarrError("At least one page must be fetched at a time")
+
+        results = await self.wanted(sort_key, 1, page_size, sort_dir)
+        page_size = results.per_page or page_size
+        pages = ceil(results.total / page_size)
+        next_page = 2
+        pending: Deque[asyncio.Future] = deque()
+
+        try:
+            while True:
+                # Request the following pages before yielding this one.
+                while next_page <= pages and len(pending) < concurrency:
+                    pending.append(
+                        asyncio.ensure_future(
+                            self.wanted(sort_key, next_page, page_size, sort_dir)
+                        )
+                    )
+                    next_page += 1
+
+                for episode in results.episodes:
+                    yield episode
+
+                if not pending:
+                    break
+
+                results = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def subscribe(
+        self,
+        events: Optional[Iterable[str]] = None,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ) -> AsyncIterator[Event]:
+        """Yield events pushed by Sonarr over its SignalR hub.
+
+        A persistent websocket connection is kept open through the client
+        session and reconnected when lost, waiting backoff seconds and
+        doubling up to max_backoff between attempts until an event is
+        received again. If events is set, only events with those names are
+        yielded. Events whose resource cannot be decoded are skipped.
+        """
+        names = set(events) if events is not None else None
+        delay = backoff
+
+        while True:
+            try:
+                websocket = await self._connect_hub()
+            except SonarrConnectionError:
+                websocket = None
+
+            if websocket is not None:
+                try:
+                    async for message in self._receive_hub(websocket):
+                        delay = backoff
+                        name = message.get("name", "unknown")
+                        if names is not None and name not in names:
+                            continue
+
+                        try:
+                            event = Event.from_dict(message)
+                        except (AttributeError, KeyError, TypeError, ValueError):
+                            # Skip events whose resource does not fit its model.
+                            continue
+
+                        yield event
+                except SonarrConnectionError:
+                    pass
+                finally:
+                    await websocket.close()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_backoff)
 
     async def __aenter__(self) -> "Sonarr":
         """Async enter."""
@@ -0,0 +1,124 @@
+"""Incremental JSON decoding for Sonarr."""
+import codecs
+import json
+import re
+from string import hexdigits
+from typing import Any, List
+
+from .exceptions import SonarrError
+
+WHITESPACE = " \t\n\r"
+
+LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+# The rest of a number whose integer part has been decoded.
+NUMBER_TAIL = re.compile(r"(\.\d*)?([eE][-+]?\d*)?")
+
+
+def incomplete(text: str, error: json.JSONDecodeError) -> bool:
+    """Return if text failed to decode only because it is truncated.
+
+    Text that can no longer be the start of a valid JSON value is not
+    incomplete, whatever data follows.
+    """
+    start = error.pos
+    rest = text[start:]
+    if not rest or error.msg.startswith("Unterminated string"):
+        return True
+
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        digits = rest[2:]
+        return len(digits) < 4 and all(digit in hexdigits for digit in digits)
+
+    if error.msg == "Expecting value":
+        return any(literal.startswith(rest) for literal in LITERALS)
+
+    if error.msg.endswith("delimiter"):
+        return NUMBER_TAIL.fullmatch(rest) is not None
+
+    return False
+
+
+class JSONArrayDecoder:
+    """Decode the elements of a top-level JSON array as data arrives."""
+
+    def __init__(self) -> None:
+        """Initialize decoder."""
+        self._buffer = ""
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._started = False
+        self._expect_value = True
+        self._empty = True
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Feed a chunk of the response body and return completed elements."""
+        buffer = self._buffer + self._text.decode(chunk)
+        items = []
+        pos = 0
+        end = len(buffer)
+
+        while not self.finished:
+            while pos < end and buffer[pos] in WHITESPACE:
+                pos += 1
+
+            if pos == end:
+                break
+
+            char = buffer[pos]
+
+            if not self._started:
+                if char != "[":
+                    raise SonarrError("Expected a JSON array in API response")
+                self._started = True
+                pos += 1
+                continue
+
+            if char == "]" and (not self._expect_value or self._empty):
+                self.finished = True
+                pos += 1
+                break
+
+            if not self._expect_value:
+                if char != ",":
+                    raise SonarrError("Malformed JSON array in API response")
+                self._expect_value = True
+                pos += 1
+                continue
+
+            try:
+                item, item_end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exception:
+                if not incomplete(buffer, exception):
+                    raise SonarrError(
+                        "Malformed JSON array in API response"
+                    ) from exception
+
+                # The element is incomplete, wait for more data.
+                break
+
+            if item_end == end and not isinstance(item, (dict, list, str)):
+                # Scalars at the end of the buffer may continue in the next chunk.
+                break
+
+            if type(item) in (int, float) and NUMBER_TAIL.fullmatch(buffer, item_end):
+                # So may the fraction or exponent of numbers.
+                break
+
+            items.append(item)
+            pos = item_end
+            self._expect_value = False
+            self._empty = False
+
+        self._buffer = buffer[pos:]
+
+        if self.finished and self._buffer.strip(WHITESPACE):
+            raise SonarrError("Unexpected data after JSON array in API response")
+
+        return items
+
+    def close(self) -> None:
+        """Ensure the complete array has been decoded."""
+        if not self.finished:
+            raise SonarrError("Incomplete JSON array in API response")
@@ -0,0 +1,200 @@
+"""Change tracking for Sonarr."""
+import asyncio
+from dataclasses import dataclass, fields, is_dataclass
+from time import monotonic
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .exceptions import SonarrConnectionError
+from .limiter import PRIORITY_BACKGROUND
+from .models import QueueItem, SeriesItem, slotted
+from .sonarr import Sonarr
+
+
+def changed_fields(old: Any, new: Any, prefix: str = "") -> Tuple[str, ...]:
+    """Return the names of the fields that differ between two model objects.
+
+    Fields holding nested models are compared field by field and reported
+    with a dotted name, such as "series.title".
+    """
+    changed: List[str] = []
+
+    for field in fields(new):
+        old_value = getattr(old, field.name)
+        new_value = getattr(new, field.name)
+
+        if old_value == new_value:
+            continue
+
+        if is_dataclass(new_value) and type(old_value) is type(new_value):
+            changed.extend(changed_fields(old_value, new_value, f"{field.name}."))
+        else:
+            changed.append(f"{prefix}{field.name}")
+
+    return tuple(changed)
+
+
+@slotted
+@dataclass(frozen=True)
+class SeriesChange:
+    """Object holding a changed series and the names of its changed fields."""
+
+    item: SeriesItem
+    fields: Tuple[str, ...]
+
+
+@slotted
+@dataclass(frozen=True)
+class SeriesChanges:
+    """Object holding the series changes found by a refresh."""
+
+    added: List[SeriesItem]
+    removed: List[SeriesItem]
+    changed: List[SeriesChange]
+
+    def __bool__(self) -> bool:
+        """Return if any series was added, removed or changed."""
+        return bool(self.added or self.removed or self.changed)
+
+
+class SeriesTracker:
+    """Keep an id-indexed snapshot of all series and report changes.
+
+    Records whose raw API payload equals the previous one are skipped
+    without rebuilding their models.
+    """
+
+    def __init__(self, sonarr: Sonarr) -> None:
+        """Initialize tracker with an empty snapshot."""
+        self.sonarr = sonarr
+        self.series: Dict[int, SeriesItem] = {}
+        self._payloads: Dict[int, dict] = {}
+
+    async def refresh(self) -> SeriesChanges:
+        """Fetch all series and return the changes since the last refresh."""
+        results = await self.sonarr._request("series", priority=PRIORITY_BACKGROUND)
+
+        return self.update_from_list(results)
+
+    def update_from_list(self, data: List[dict]) -> SeriesChanges:
+        """Update the snapshot from a series API response and return changes."""
+        added: List[SeriesItem] = []
+        changed: List[SeriesChange] = []
+        payloads: Dict[int, dict] = {}
+
+        for result in data:
+            series_id = result.get("id", 0)
+            payloads[series_id] = result
+
+            previous = self._payloads.get(series_id, None)
+            if previous == result:
+                continue
+
+            item = SeriesItem.from_dict(result)
+            if previous is None:
+                added.append(item)
+            else:
+                changes = changed_fields(self.series[series_id], item)
+                if changes:
+                    changed.append(SeriesChange(item=item, fields=changes))
+
+            self.series[series_id] = item
+
+        removed = [
+            self.series.pop(series_id)
+            for series_id in list(self.series)
+            if series_id not in payloads
+        ]
+
+        self._payloads = payloads
+
+        return SeriesChanges(added=added, removed=removed, changed=changed)
+
+
+@slotted
+@dataclass(frozen=True)
+class QueueProgress:
+    """Object holding a changed queue item and its download throughput."""
+
+    item: QueueItem
+    throughput: Optional[float] = None
+    removed: bool = False
+
+
+class QueueWatcher:
+    """Poll the download queue adaptively and report changed items.
+
+    The queue is polled every min_interval seconds while items are
+    downloading or changing, and the interval grows by backoff up to
+    max_interval while the queue is idle. Throughput in bytes per second is
+    computed from the size remaining between successive polls.
+    """
+
+    def __init__(
+        self,
+        sonarr: Sonarr,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        backoff: float = 2.0,
+    ) -> None:
+        """Initialize watcher with an empty queue."""
+        self.sonarr = sonarr
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.items: Dict[int, QueueItem] = {}
+        self._polled: Optional[float] = None
+
+    async def watch(self) -> AsyncIterator[QueueProgress]:
+        """Poll the queue forever, yielding added, changed and removed items.
+
+        Polls that fail to reach Sonarr are retried every max_interval
+        seconds until the queue can be fetched again.
+        """
+        while True:
+            try:
+                items = await self.sonarr.queue()
+            except SonarrConnectionError:
+                self.interval = self.max_interval
+            else:
+                for progress in self.update_from_list(items, monotonic()):
+                    yield progress
+
+            await asyncio.sleep(self.interval)
+
+    def update_from_list(
+        self, items: List[QueueItem], polled: float
+    ) -> List[QueueProgress]:
+        """Update the queue from a poll at the given time and return changes."""
+        elapsed = None if self._polled is None else polled - self._polled
+        changes: List[QueueProgress] = []
+        current: Dict[int, QueueItem] = {}
+        active = False
+
+        for item in items:
+            current[item.queue_id] = item
+            active = active or item.status.lower() == "downloading"
+
+            previous = self.items.get(item.queue_id, None)
+            if previous == item:
+                continue
+
+            throughput = None
+            if previous is not None and elapsed:
+                throughput = (previous.size_remaining - item.size_remaining) / elapsed
+
+            changes.append(QueueProgress(item=item, throughput=throughput))
+
+        for queue_id, item in self.items.items():
+            if queue_id not in current:
+                changes.append(QueueProgress(item=item, removed=True))
+
+        if active or changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+        self.items = current
+        self._polled = polled
+
+        return changes
@@ -0,0 +1,53 @@
+"""Tests for Sonarr response cache."""
+from sonarr.cache import CacheEntry, ResponseCache
+
+
+def test_key() -> None:
+    """Test cache keys ignore parameter order."""
+    assert ResponseCache.key("calendar", {"start": "a", "end": "b"}) == (
+        ResponseCache.key("calendar", {"end": "b", "start": "a"})
+    )
+    assert ResponseCache.key("series") != ResponseCache.key("calendar")
+
+
+def test_ttl_for() -> None:
+    """Test time to live lookup by endpoint."""
+    cache = ResponseCache(ttl=5, ttls={"command": 0, "system/status": 600})
+
+    assert cache.ttl_for("command/1") == 0
+    assert cache.ttl_for("system/status") == 600
+    assert cache.ttl_for("series") == 5
+
+
+def test_validators() -> None:
+    """Test conditional request headers."""
+    entry = CacheEntry(data=[], size=2, expires=0, etag='"abc"')
+    assert entry.validators() == {"If-None-Match": '"abc"'}
+    assert not entry.fresh
+
+    entry = CacheEntry(
+        data=[], size=2, expires=0, last_modified="Wed, 21 Oct 2015 07:28:00 GMT"
+    )
+    assert entry.validators() == {"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}
+
+
+def test_lru_eviction() -> None:
+    """Test least recently used entries are evicted by size."""
+    cache = ResponseCache(max_size=10)
+
+    cache.set("a", CacheEntry(data="a", size=4, expires=0))
+    cache.set("b", CacheEntry(data="b", size=4, expires=0))
+    assert cache.get("a").data == "a"
+
+    cache.set("c", CacheEntry(data="c", size=4, expires=0))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size == 8
+
+    cache.set("d", CacheEntry(data="d", size=11, expires=0))
+    assert cache.get("d") is None
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
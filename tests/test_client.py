@@ -1,11 +1,13 @@
 """Tests for Sonarr."""
 import asyncio
+import json
 
 import pytest
 from aiohttp import ClientSession
-from sonarr import Client
+from sonarr import CircuitBreaker, Client, ResponseCache, RetryPolicy
 from sonarr.exceptions import (
     SonarrAccessRestricted,
+    SonarrCircuitOpen,
     SonarrConnectionError,
     SonarrError,
     SonarrResourceNotFound,
@@ -39,6 +41,225 @@ async def test_json_request(aresponses):
         assert response["status"] == "OK"
 
 
+@pytest.mark.asyncio
+async def test_json_request_custom_loads(aresponses):
+    """Test JSON response is handled correctly with a custom JSON decoder."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"status": "OK"}',
+        ),
+    )
+
+    payloads = []
+
+    def json_loads(payload):
+        payloads.append(payload)
+        return json.loads(payload)
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, json_loads=json_loads)
+        response = await client._request("system/status")
+        assert response["status"] == "OK"
+        assert payloads == [b'{"status": "OK"}']
+
+
+@pytest.mark.asyncio
+async def test_json_request_empty(aresponses):
+    """Test empty JSON response is handled correctly."""
+    for body in ("", " \r\n"):
+        aresponses.add(
+            MATCH_HOST,
+            "/api/command",
+            "POST",
+            aresponses.Response(
+                status=202,
+                headers={"Content-Type": "application/json"},
+                text=body,
+            ),
+        )
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session)
+        assert await client._request("command", method="POST") is None
+        assert await client._request("command", method="POST") is None
+
+
+def test_default_json_loads():
+    """Test the default JSON decoder accepts bytes."""
+    client = Client(HOST, API_KEY)
+    assert client.json_loads(b'{"status": "OK"}') == {"status": "OK"}
+
+
+@pytest.mark.asyncio
+async def test_cached_request(aresponses):
+    """Test fresh cached responses are served without a request."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"status": "OK"}',
+        ),
+    )
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, cache=ResponseCache())
+        assert await client._request("system/status") == {"status": "OK"}
+        assert await client._request("system/status") == {"status": "OK"}
+        assert len(client.cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_request_revalidate(aresponses):
+    """Test stale cached responses are revalidated with conditional requests."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/queue",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json", "ETag": '"v1"'},
+            text='[{"id": 1}]',
+        ),
+    )
+
+    async def not_modified(request):
+        assert request.headers["If-None-Match"] == '"v1"'
+        return aresponses.Response(status=304)
+
+    aresponses.add(MATCH_HOST, "/api/queue", "GET", not_modified)
+
+    async with ClientSession() as session:
+        cache = ResponseCache(ttls={"queue": 0})
+        client = Client(HOST, API_KEY, session=session, cache=cache)
+        first = await client._request("queue")
+        assert first == [{"id": 1}]
+        assert await client._request("queue") is first
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request(aresponses):
+    """Test concurrent identical requests share one in-flight request."""
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='[{"id": 1}]',
+        )
+
+    aresponses.add(MATCH_HOST, "/api/queue", "GET", handler)
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, coalesce_requests=True)
+        first, second = await asyncio.gather(
+            client._request("queue"), client._request("queue")
+        )
+
+        assert first == [{"id": 1}]
+        assert first is second
+        assert not client._in_flight
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request_error(aresponses):
+    """Test errors of a shared request are raised to every caller."""
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return aresponses.Response(text="Internal Server Error", status=500)
+
+    aresponses.add(MATCH_HOST, "/api/queue", "GET", handler)
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, coalesce_requests=True)
+        results = await asyncio.gather(
+            client._request("queue"),
+            client._request("queue"),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, SonarrError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request_cancel(aresponses):
+    """Test cancelling one caller does not cancel the shared request."""
+
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"status": "OK"}',
+        )
+
+    aresponses.add(MATCH_HOST, "/api/system/status", "GET", handler)
+    aresponses.add(MATCH_HOST, "/api/system/status", "GET", handler)
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, coalesce_requests=True)
+        first = asyncio.ensure_future(client._request("system/status"))
+        second = asyncio.ensure_future(client._request("system/status"))
+        await asyncio.sleep(0.05)
+
+        first.cancel()
+        assert await second == {"status": "OK"}
+        assert first.cancelled()
+
+        third = asyncio.ensure_future(client._request("system/status"))
+        await asyncio.sleep(0.05)
+        flight = next(iter(client._in_flight.values()))
+
+        third.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await third
+        await asyncio.sleep(0)
+        assert flight.task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_coalesced_request_abandoned(aresponses):
+    """Test callers do not join a request cancelled by its last caller."""
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"status": "OK"}',
+        )
+
+    aresponses.add(MATCH_HOST, "/api/system/status", "GET", handler)
+    aresponses.add(MATCH_HOST, "/api/system/status", "GET", handler)
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, coalesce_requests=True)
+        first = asyncio.ensure_future(client._request("system/status"))
+        await asyncio.sleep(0.05)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(client._request("system/status"))
+
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert results[1] == {"status": "OK"}
+        assert not client._in_flight
+
+
 @pytest.mark.asyncio
 async def test_text_request(aresponses):
     """Test non JSON response is handled correctly."""
@@ -70,6 +291,36 @@ async def test_internal_session(aresponses):
         assert response["status"] == "OK"
 
 
+@pytest.mark.asyncio
+async def test_internal_session_connector(aresponses):
+    """Test internal session is created with the connection pool options."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"status": "OK"}',
+        ),
+    )
+
+    async with Client(
+        HOST,
+        API_KEY,
+        connection_limit=20,
+        connection_limit_per_host=4,
+        keepalive_timeout=60,
+        dns_cache_ttl=0,
+    ) as client:
+        await client._request("system/status")
+
+        connector = client._session.connector
+        assert connector.limit == 20
+        assert connector.limit_per_host == 4
+        assert not connector.use_dns_cache
+
+
 @pytest.mark.asyncio
 async def test_post_request(aresponses):
     """Test POST requests are handled correctly."""
@@ -121,6 +372,30 @@ async def test_request_base_path(aresponses):
         assert response == "GOTCHA!"
 
 
+@pytest.mark.asyncio
+async def test_request_settings_changed(aresponses):
+    """Test requests follow connection settings changed after creation."""
+    aresponses.add(
+        f"{HOST}:{NON_STANDARD_PORT}",
+        "/api/v3/system/status",
+        "GET",
+        aresponses.Response(text="GOTCHA!", status=200),
+    )
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session)
+        assert client._headers["X-Api-Key"] == API_KEY
+
+        client.port = NON_STANDARD_PORT
+        client.base_path = "/api/v3"
+        client.api_key = "NEW_API_KEY"
+        assert client._headers["X-Api-Key"] == "NEW_API_KEY"
+        assert client._headers is client._headers
+
+        response = await client._request("system/status")
+        assert response == "GOTCHA!"
+
+
 @pytest.mark.asyncio
 async def test_timeout(aresponses):
     """Test request timeout from the API."""
@@ -214,3 +489,107 @@ async def test_http_error500_json(aresponses):
             response = await client._request("system/status")
             assert response
             assert response["status"] == "NOK"
+
+
+@pytest.mark.asyncio
+async def test_retry_status(aresponses):
+    """Test retryable statuses are retried honouring Retry-After."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        aresponses.Response(
+            status=503, headers={"Retry-After": "0"}, text="Unavailable"
+        ),
+    )
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text='{"status": "OK"}',
+        ),
+    )
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, retry=RetryPolicy())
+        response = await client._request("system/status")
+        assert response["status"] == "OK"
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_retry_timeout(aresponses):
+    """Test timeouts are retried until attempts are exhausted."""
+
+    async def response_handler(_):
+        await asyncio.sleep(1)
+        return aresponses.Response(body="Timeout!")
+
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        response_handler,
+        repeat=2,
+    )
+
+    async with ClientSession() as session:
+        client = Client(
+            HOST,
+            API_KEY,
+            session=session,
+            request_timeout=0.1,
+            retry=RetryPolicy(attempts=2, backoff=0.01),
+        )
+        with pytest.raises(SonarrConnectionError):
+            assert await client._request("system/status")
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_retry_post(aresponses):
+    """Test non idempotent requests are not retried."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/command",
+        "POST",
+        aresponses.Response(status=503, text="Unavailable"),
+    )
+
+    async with ClientSession() as session:
+        client = Client(HOST, API_KEY, session=session, retry=RetryPolicy())
+        with pytest.raises(SonarrError):
+            await client._request("command", method="POST")
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker(aresponses):
+    """Test requests fail fast while the circuit breaker is open."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        aresponses.Response(status=500, text="Internal Server Error"),
+    )
+
+    async with ClientSession() as session:
+        client = Client(
+            HOST,
+            API_KEY,
+            session=session,
+            circuit_breaker=CircuitBreaker(failure_threshold=1),
+        )
+        with pytest.raises(SonarrError):
+            await client._request("system/status")
+
+        with pytest.raises(SonarrCircuitOpen):
+            await client._request("system/status")
+
+    aresponses.assert_plan_strictly_followed()
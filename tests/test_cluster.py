@@ -0,0 +1,105 @@
+"""Tests for Sonarr multi-instance client."""
+import asyncio
+
+import pytest
+from sonarr import ClusterResults, SonarrCluster, SonarrConnectionError, SonarrError
+from sonarr.models import QueueItem
+
+from . import load_fixture
+
+API_KEY = "MOCK_API_KEY"
+HOSTS = {"eu": "192.168.1.89", "us": "192.168.1.90"}
+PORT = 8989
+
+
+def add_queue(aresponses, host):
+    """Add a queue response for a host."""
+    aresponses.add(
+        f"{host}:{PORT}",
+        "/api/queue",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("queue.json"),
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_queue(aresponses):
+    """Test queue calls are fanned out and merged."""
+    for host in HOSTS.values():
+        add_queue(aresponses, host)
+
+    async with SonarrCluster() as cluster:
+        for name, host in HOSTS.items():
+            cluster.add(name, host, API_KEY)
+
+        response = await cluster.queue()
+
+        assert not response.errors
+        assert set(response.results) == set(HOSTS)
+
+        merged = response.merged()
+        assert [name for name, _ in merged] == list(HOSTS)
+        assert all(isinstance(item, QueueItem) for _, item in merged)
+
+        sessions = {client._session for client in cluster.instances.values()}
+        assert len(sessions) == 1
+
+
+@pytest.mark.asyncio
+async def test_partial_failure(aresponses):
+    """Test failing and slow instances are reported as errors."""
+    add_queue(aresponses, HOSTS["eu"])
+
+    async def slow(request):
+        await asyncio.sleep(0.5)
+        return aresponses.Response(status=200, text="[]")
+
+    aresponses.add(f"{HOSTS['us']}:{PORT}", "/api/queue", "GET", slow)
+    aresponses.add(
+        f"192.168.1.91:{PORT}",
+        "/api/queue",
+        "GET",
+        aresponses.Response(text="Internal Server Error", status=500),
+    )
+    aresponses.add(
+        f"192.168.1.92:{PORT}",
+        "/api/queue",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text="[{",
+        ),
+    )
+
+    async with SonarrCluster(instance_timeout=0.1) as cluster:
+        for name, host in HOSTS.items():
+            cluster.add(name, host, API_KEY)
+        cluster.add("ap", "192.168.1.91", API_KEY)
+        cluster.add("sa", "192.168.1.92", API_KEY)
+
+        response = await cluster.queue()
+
+        assert list(response.results) == ["eu"]
+        assert isinstance(response.errors["us"], SonarrConnectionError)
+        assert isinstance(response.errors["ap"], SonarrError)
+        assert isinstance(response.errors["sa"], ValueError)
+
+
+def test_merged():
+    """Test list and single results are merged."""
+    response = ClusterResults(results={"eu": [1, 2], "us": "app"}, errors={})
+    assert response.merged() == [("eu", 1), ("eu", 2), ("us", "app")]
+
+
+def test_add_duplicate():
+    """Test adding an instance twice fails."""
+    cluster = SonarrCluster()
+    cluster.add("eu", HOSTS["eu"], API_KEY)
+
+    with pytest.raises(SonarrError):
+        cluster.add("eu", HOSTS["eu"], API_KEY)
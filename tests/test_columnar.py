@@ -0,0 +1,156 @@
+"""Tests for Sonarr columnar export."""
+import copy
+import json
+import subprocess
+import sys
+
+import pytest
+import sonarr.columnar
+from sonarr import SeriesColumns, Sonarr, SonarrError
+from sonarr.models import SeriesItem
+
+from . import load_fixture
+
+API_KEY = "MOCK_API_KEY"
+HOST = "192.168.1.89"
+PORT = 8989
+
+MATCH_HOST = f"{HOST}:{PORT}"
+
+SERIES = json.loads(load_fixture("series.json"))
+
+
+def make_library():
+    """Return a series response with three series on two networks."""
+    library = []
+    for series_id, network, diskspace, downloaded, episodes in (
+        (1, "CBS", 100, 2, 4),
+        (2, "NBC", 50, 1, 1),
+        (3, "CBS", 25, 0, 5),
+    ):
+        data = copy.deepcopy(SERIES[0])
+        data.update(
+            id=series_id,
+            network=network,
+            sizeOnDisk=diskspace,
+            episodeFileCount=downloaded,
+            episodeCount=episodes,
+            totalEpisodeCount=episodes + 1,
+        )
+        library.append(data)
+
+    return library
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    """Build columns with NumPy, if installed, and with stdlib arrays."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(sonarr.columnar, "import_numpy", lambda: None)
+
+    return request.param
+
+
+def test_columns(backend) -> None:
+    """Test columns match the fields of the models."""
+    library = make_library()
+    columns = SeriesColumns(library)
+    items = [SeriesItem.from_dict(data) for data in library]
+
+    assert len(columns) == 3
+    assert list(columns.series["series_id"]) == [1, 2, 3]
+    assert columns.series["title"] == [item.series.title for item in items]
+    assert list(columns.series["diskspace"]) == [item.diskspace for item in items]
+    assert bool(columns.series["monitored"][0]) == items[0].series.monitored
+
+    seasons = items[0].seasons
+    assert len(columns.seasons["number"]) == 3 * len(seasons)
+    assert list(columns.seasons["series_id"][: len(seasons)]) == [1] * len(seasons)
+    assert list(columns.seasons["number"][: len(seasons)]) == [
+        season.number for season in seasons
+    ]
+    assert list(columns.seasons["total_episodes"][: len(seasons)]) == [
+        season.total_episodes for season in seasons
+    ]
+    assert list(columns.seasons["progress"][: len(seasons)]) == [
+        season.progress for season in seasons
+    ]
+
+
+def test_aggregates(backend) -> None:
+    """Test aggregates in total and per group."""
+    columns = SeriesColumns(make_library())
+
+    assert columns.diskspace() == 175
+    assert columns.downloaded() == 3
+    assert columns.total_episodes() == 13
+    assert columns.progress() == 30.0
+
+    assert columns.diskspace(by="network") == {"CBS": 125, "NBC": 50}
+    assert columns.downloaded(by="network") == {"CBS": 2, "NBC": 1}
+    assert columns.total_episodes(by="network") == {"CBS": 11, "NBC": 2}
+    assert columns.progress(by="network") == {"CBS": 2 / 9 * 100, "NBC": 100.0}
+
+
+def test_empty(backend) -> None:
+    """Test aggregates of an empty library."""
+    columns = SeriesColumns([])
+
+    assert len(columns) == 0
+    assert columns.diskspace() == 0
+    assert columns.progress() == 0.0
+    assert columns.diskspace(by="network") == {}
+
+
+def test_to_arrow(backend) -> None:
+    """Test columns are exported as Arrow tables."""
+    pyarrow = pytest.importorskip("pyarrow")
+    columns = SeriesColumns(make_library())
+
+    table = columns.to_arrow()
+    assert table.num_rows == 3
+    assert table.column("network").to_pylist() == ["CBS", "NBC", "CBS"]
+    assert table.schema.field("monitored").type == pyarrow.bool_()
+
+    seasons = columns.to_arrow(seasons=True)
+    assert seasons.num_rows == len(columns.seasons["number"])
+    assert seasons.schema.field("progress").type == pyarrow.float64()
+
+
+def test_to_arrow_missing(monkeypatch) -> None:
+    """Test Arrow export without pyarrow installed."""
+    monkeypatch.setattr(sonarr.columnar, "import_pyarrow", lambda: None)
+
+    with pytest.raises(SonarrError):
+        SeriesColumns([]).to_arrow()
+
+
+def test_lazy_imports() -> None:
+    """Test importing the package does not import NumPy or pyarrow."""
+    code = "import sys, sonarr; print(sorted({'numpy', 'pyarrow'} & set(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, stdout=subprocess.PIPE
+    ).stdout
+    assert output.decode().strip() == "[]"
+
+
+@pytest.mark.asyncio
+async def test_series_columns(aresponses):
+    """Test columns are built from the series endpoint."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=json.dumps(make_library()),
+        ),
+    )
+
+    async with Sonarr(HOST, API_KEY) as client:
+        columns = await client.series_columns()
+
+    assert columns.diskspace() == 175
@@ -0,0 +1,181 @@
+"""Tests for Sonarr response compression."""
+import gzip
+import json
+import zlib
+
+import pytest
+from aiohttp import ClientSession
+from sonarr import Sonarr, SonarrError
+from sonarr.compression import Decompressor, accept_encoding, decompress
+
+from . import load_fixture
+
+try:
+    from brotli import compress as brotli_compress
+except ImportError:  # pragma: no cover
+    brotli_compress = None
+from .test_metrics import RecordingObserver
+
+API_KEY = "MOCK_API_KEY"
+HOST = "192.168.1.89"
+PORT = 8989
+
+MATCH_HOST = f"{HOST}:{PORT}"
+
+
+def gzip_response(aresponses, path, fixture, encoding="gzip"):
+    """Return a handler serving a compressed fixture and recording the request."""
+    body = load_fixture(fixture).encode("utf-8")
+    if encoding == "gzip":
+        compressed = gzip.compress(body)
+    else:
+        compressed = zlib.compress(body)
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json", "Content-Encoding": encoding},
+            body=compressed,
+        )
+
+    aresponses.add(MATCH_HOST, path, "GET", handler)
+    return body, compressed, requests
+
+
+def test_accept_encoding() -> None:
+    """Test the negotiated encodings."""
+    assert "gzip" in accept_encoding()
+    assert accept_encoding(False) == "identity"
+
+
+def test_decompressor() -> None:
+    """Test incremental decompression."""
+    body = load_fixture("series.json").encode("utf-8")
+    compressed = zlib.compress(body)
+
+    decompressor = Decompressor("deflate")
+    result = b""
+    for pos in range(0, len(compressed), 100):
+        end = pos + 100
+        result += decompressor.decompress(compressed[pos:end])
+
+    assert result + decompressor.flush() == body
+    assert decompress(gzip.compress(body), "GZIP") == body
+
+
+def test_decompressor_raw_deflate() -> None:
+    """Test deflate without the zlib wrapper is decompressed."""
+    body = load_fixture("series.json").encode("utf-8")
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    compressed = compressor.compress(body) + compressor.flush()
+
+    decompressor = Decompressor("deflate")
+    result = b""
+    for pos in range(len(compressed)):
+        end = pos + 1
+        result += decompressor.decompress(compressed[pos:end])
+
+    assert result + decompressor.flush() == body
+    assert decompress(b"", "deflate") == b""
+
+
+@pytest.mark.parametrize(
+    "encoding,compress",
+    [("gzip", gzip.compress), ("deflate", zlib.compress), ("br", brotli_compress)],
+)
+def test_decompressor_truncated(encoding, compress) -> None:
+    """Test truncated bodies raise SonarrError."""
+    if compress is None:
+        pytest.skip("brotli is not installed")
+
+    compressed = compress(load_fixture("series.json").encode("utf-8"))
+
+    with pytest.raises(SonarrError):
+        decompress(compressed[:-4], encoding)
+
+
+def test_decompressor_errors() -> None:
+    """Test unsupported and corrupt bodies raise SonarrError."""
+    with pytest.raises(SonarrError):
+        Decompressor("compress")
+
+    with pytest.raises(SonarrError):
+        decompress(b"not gzip", "gzip")
+
+
+@pytest.mark.asyncio
+async def test_compressed_response(aresponses):
+    """Test compressed responses are decompressed and measured."""
+    body, compressed, requests = gzip_response(aresponses, "/api/series", "series.json")
+    observer = RecordingObserver()
+
+    async with Sonarr(HOST, API_KEY, observers=[observer]) as client:
+        series = await client.series()
+
+    assert series[0].series.title
+    assert "gzip" in requests[0].headers["Accept-Encoding"]
+
+    metrics = observer.requests[0]
+    assert metrics.encoding == "gzip"
+    assert metrics.size == len(body)
+    assert metrics.transferred == len(compressed)
+
+
+@pytest.mark.asyncio
+async def test_compressed_stream(aresponses):
+    """Test streamed compressed responses are decompressed and measured."""
+    body, compressed, _ = gzip_response(
+        aresponses, "/api/series", "series.json", "deflate"
+    )
+    observer = RecordingObserver()
+
+    async with Sonarr(HOST, API_KEY, observers=[observer]) as client:
+        series = [item async for item in client.iter_series()]
+
+    assert len(series) == len(json.loads(body))
+
+    metrics = observer.requests[0]
+    assert metrics.encoding == "deflate"
+    assert metrics.size == len(body)
+    assert metrics.transferred == len(compressed)
+
+
+@pytest.mark.asyncio
+async def test_compressed_response_session(aresponses):
+    """Test responses decompressed by a provided session are measured."""
+    body, compressed, _ = gzip_response(aresponses, "/api/series", "series.json")
+    observer = RecordingObserver()
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session, observers=[observer])
+        assert await client.series()
+
+    metrics = observer.requests[0]
+    assert metrics.size == len(body)
+    assert metrics.transferred == len(compressed)
+
+
+@pytest.mark.asyncio
+async def test_compression_disabled(aresponses):
+    """Test compression can be disabled."""
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("queue.json"),
+        )
+
+    aresponses.add(MATCH_HOST, "/api/queue", "GET", handler)
+    observer = RecordingObserver()
+
+    async with Sonarr(HOST, API_KEY, compression=False, observers=[observer]) as client:
+        assert await client.queue()
+
+    assert requests[0].headers["Accept-Encoding"] == "identity"
+    assert observer.requests[0].encoding is None
+    assert observer.requests[0].transferred == observer.requests[0].size
@@ -0,0 +1,93 @@
+"""Tests for Sonarr disk usage history."""
+import json
+
+import pytest
+import sonarr.history
+from sonarr import SonarrError
+from sonarr.history import DiskHistory
+from sonarr.models import Application
+
+from . import load_fixture
+
+GB = 1024**3
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Fit rates with NumPy, if installed, and in plain Python."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(sonarr.history, "import_numpy", lambda: None)
+
+    return request.param
+
+
+def test_ring_buffer() -> None:
+    """Test the oldest samples are overwritten once full."""
+    history = DiskHistory(size=3)
+
+    for timestamp in range(5):
+        history.record(float(timestamp), 100 - timestamp, 100)
+
+    times, used, total = history.samples()
+    assert len(history) == 3
+    assert list(times) == [2.0, 3.0, 4.0]
+    assert list(used) == [2, 3, 4]
+    assert list(total) == [100, 100, 100]
+
+
+def test_size() -> None:
+    """Test a history must hold at least one sample."""
+    with pytest.raises(SonarrError):
+        DiskHistory(size=0)
+
+
+def test_rate(backend) -> None:
+    """Test the fill rate and time to full are estimated."""
+    history = DiskHistory(size=4)
+    assert history.rate() is None
+
+    history.record(0.0, 100 * GB, 200 * GB)
+    assert history.rate() is None
+
+    for hour in range(1, 6):
+        history.record(hour * 3600.0, (100 - hour * 2) * GB, 200 * GB)
+
+    assert history.rate() == pytest.approx(2 * GB / 3600)
+    assert history.time_to_full() == pytest.approx(90 * 3600 / 2)
+
+
+def test_not_filling(backend) -> None:
+    """Test no time to full is estimated while space is being freed."""
+    history = DiskHistory()
+    history.record(0.0, 100, 200)
+    history.record(60.0, 110, 200)
+
+    assert history.rate() < 0
+    assert history.time_to_full() is None
+
+    same_time = DiskHistory()
+    same_time.record(0.0, 100, 200)
+    same_time.record(0.0, 90, 200)
+    assert same_time.rate() is None
+
+
+def test_application_history() -> None:
+    """Test Application records disk history only when enabled."""
+    data = {
+        "info": json.loads(load_fixture("system-status.json")),
+        "diskspace": json.loads(load_fixture("diskspace.json")),
+    }
+
+    assert Application(data).history == {}
+
+    app = Application(data, history_size=2)
+    app.update_from_dict({"diskspace": data["diskspace"]})
+    app.update_from_dict({"diskspace": data["diskspace"]})
+
+    history = app.history["C:\\"]
+    assert len(history) == 2
+    _, used, total = history.samples()
+    assert list(total) == [499738734592, 499738734592]
+    assert list(used) == [499738734592 - 282500067328] * 2
@@ -0,0 +1,105 @@
+"""Tests for the Sonarr episode index."""
+import json
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from sonarr import EpisodeIndex
+from sonarr.models import Episode, WantedResults
+
+from . import load_fixture
+
+CALENDAR = [
+    Episode.from_dict(data) for data in json.loads(load_fixture("calendar.json"))
+]
+WANTED = WantedResults.from_dict(json.loads(load_fixture("wanted-missing.json")))
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def make_episodes(count, series_id=3):
+    """Return episodes of a series airing a day apart from START."""
+    template = CALENDAR[0]
+    series = replace(template.series, series_id=series_id)
+
+    return [
+        replace(
+            template,
+            episode_id=series_id * 1000 + number,
+            episode_number=number,
+            airs=START + timedelta(days=number),
+            series=series,
+        )
+        for number in range(count)
+    ]
+
+
+def test_index() -> None:
+    """Test episodes from calendar and wanted responses are indexed."""
+    index = EpisodeIndex(CALENDAR)
+    index.update(WANTED.episodes)
+
+    assert len(index) == 2
+    assert 14402 in index
+    assert index.get(889).series.series_id == 17
+    assert index.get(1) is None
+    assert [episode.episode_id for episode in index] == [889, 14402]
+    assert [episode.episode_id for episode in index.for_series(66)] == [14402]
+    assert index.for_series(1) == []
+
+
+def test_between() -> None:
+    """Test air time range queries are half-open."""
+    episodes = make_episodes(10)
+    index = EpisodeIndex(reversed(episodes))
+
+    assert index.between(START, START + timedelta(days=3)) == episodes[:3]
+    assert index.between(START + timedelta(hours=12), START + timedelta(days=2)) == [
+        episodes[1]
+    ]
+    assert index.between(START + timedelta(days=20), START + timedelta(days=30)) == []
+    assert index.between(START - timedelta(days=1), START + timedelta(days=30)) == (
+        episodes
+    )
+
+
+def test_upsert() -> None:
+    """Test upserts replace episodes and keep the air time order."""
+    episodes = make_episodes(100) + make_episodes(100, series_id=4)
+    index = EpisodeIndex(episodes)
+
+    moved = replace(episodes[0], airs=START + timedelta(days=50, hours=1))
+    index.upsert(moved)
+
+    assert len(index) == 200
+    assert index.get(moved.episode_id) is moved
+    assert index.between(START, START + timedelta(days=1)) == [episodes[100]]
+    assert moved in index.between(
+        START + timedelta(days=50), START + timedelta(days=51)
+    )
+    assert index.for_series(3)[0] is moved
+
+    unaired = replace(episodes[1], airs=None)
+    index.update([unaired])
+    assert index.get(unaired.episode_id) is unaired
+    assert unaired not in list(index)
+
+    airs = [episode.airs for episode in index]
+    assert airs == sorted(airs)
+    assert len(airs) == 199
+
+
+def test_remove() -> None:
+    """Test removed episodes are no longer found."""
+    episodes = make_episodes(3)
+    index = EpisodeIndex(episodes)
+
+    assert index.remove(episodes[1].episode_id) is episodes[1]
+    assert index.remove(episodes[1].episode_id) is None
+    assert list(index) == [episodes[0], episodes[2]]
+    assert index.for_series(3) == [episodes[0], episodes[2]]
+
+    for episode in episodes:
+        index.remove(episode.episode_id)
+
+    assert len(index) == 0
+    assert index.for_series(3) == []
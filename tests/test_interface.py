@@ -1,10 +1,13 @@
 """Tests for Sonarr."""
+import asyncio
+import json
+import time
 from typing import List
 
 import pytest
 import sonarr.models as models
-from aiohttp import ClientSession
-from sonarr import Sonarr
+from aiohttp import ClientResponse, ClientSession
+from sonarr import Sonarr, SonarrError
 
 from . import load_fixture
 
@@ -81,6 +84,33 @@ async def test_calendar(aresponses):
         assert isinstance(response[0], models.Episode)
 
 
+@pytest.mark.asyncio
+async def test_iter_calendar(aresponses):
+    """Test iter_calendar method is handled correctly."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/calendar?start=2014-01-26&end=2014-01-27",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("calendar.json"),
+        ),
+        match_querystring=True,
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = [
+            episode
+            async for episode in client.iter_calendar("2014-01-26", "2014-01-27")
+        ]
+
+        assert len(response) == 1
+        assert isinstance(response[0], models.Episode)
+        assert response[0].identifier == "S04E11"
+
+
 @pytest.mark.asyncio
 async def test_commands(aresponses):
     """Test commands method is handled correctly."""
@@ -128,6 +158,127 @@ async def test_command_status(aresponses):
         assert isinstance(response, models.CommandItem)
 
 
+@pytest.mark.asyncio
+async def test_wait_for_command(aresponses):
+    """Test wait_for_command method is handled correctly."""
+    commands = json.loads(load_fixture("command.json"))
+    command_id = json.loads(load_fixture("command-id.json"))
+
+    aresponses.add(
+        MATCH_HOST,
+        "/api/command",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=json.dumps(commands),
+        ),
+    )
+    aresponses.add(
+        MATCH_HOST,
+        "/api/command",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=json.dumps([{**commands[0], "state": "completed"}, commands[1]]),
+        ),
+    )
+    aresponses.add(
+        MATCH_HOST,
+        "/api/command",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text="[]",
+        ),
+    )
+    aresponses.add(
+        MATCH_HOST,
+        f"/api/command/{commands[1]['id']}",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=json.dumps({**command_id, "state": "failed"}),
+        ),
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = await client.wait_for_command(
+            [command["id"] for command in commands], interval=0.01
+        )
+
+        assert response[commands[0]["id"]].state == "completed"
+        assert response[commands[1]["id"]].state == "failed"
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_command_lookups(aresponses):
+    """Test wait_for_command method only looks up unlisted commands once."""
+    command = json.loads(load_fixture("command-id.json"))
+
+    def status(command_id, state):
+        return {**command, "id": command_id, "state": state}
+
+    # Started commands listed on each tick.
+    ticks = [[], [], [status(3, "started")], [status(4, "completed")]]
+    lookups = {1: "completed", 2: "completed", 3: "started", 4: "started"}
+    requests = []
+
+    async def handler(request):
+        if request.path == "/api/command":
+            requests.append([])
+            data = ticks[len(requests) - 1]
+        else:
+            command_id = int(request.path.rsplit("/", 1)[1])
+            requests[-1].append(command_id)
+            data = status(command_id, lookups[command_id])
+            lookups[command_id] = "completed"
+
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=json.dumps(data),
+        )
+
+    aresponses.add(MATCH_HOST, aresponses.ANY, "GET", handler, repeat=9)
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = await client.wait_for_command([1, 2, 3, 4], interval=0.01)
+
+        assert sorted(response) == [1, 2, 3, 4]
+        assert [sorted(tick) for tick in requests] == [[1, 2, 3, 4], [], [], [3]]
+
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_command_timeout(aresponses):
+    """Test wait_for_command method times out."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/command",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("command.json"),
+        ),
+        repeat=aresponses.INFINITY,
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        with pytest.raises(SonarrError):
+            await client.wait_for_command(368621, timeout=0.05, interval=0.01)
+
+
 @pytest.mark.asyncio
 async def test_queue(aresponses):
     """Test queue method is handled correctly."""
@@ -155,6 +306,28 @@ async def test_queue(aresponses):
         assert isinstance(response[0].episode, models.Episode)
 
 
+@pytest.mark.asyncio
+async def test_iter_queue(aresponses):
+    """Test iter_queue method is handled correctly."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/queue",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("queue.json"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = [item async for item in client.iter_queue()]
+
+        assert len(response) == 1
+        assert isinstance(response[0], models.QueueItem)
+
+
 @pytest.mark.asyncio
 async def test_series(aresponses):
     """Test series method is handled correctly."""
@@ -188,6 +361,106 @@ async def test_series(aresponses):
         assert isinstance(response[0].seasons[0], models.Season)
 
 
+@pytest.mark.asyncio
+async def test_series_lazy(aresponses):
+    """Test series method is handled correctly in lazy mode."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("series.json"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = await client.series(lazy=True)
+
+        assert response
+        assert isinstance(response, List)
+
+        assert isinstance(response[0], models.LazySeriesItem)
+        assert response[0].series.title == "The Andy Griffith Show"
+        assert isinstance(response[0].seasons[0], models.Season)
+        assert isinstance(response[0].materialize(), models.SeriesItem)
+
+
+@pytest.mark.asyncio
+async def test_iter_series(aresponses):
+    """Test iter_series method is handled correctly."""
+    for _ in range(2):
+        aresponses.add(
+            MATCH_HOST,
+            "/api/series",
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture("series.json"),
+            ),
+        )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = [item async for item in client.iter_series()]
+
+        assert response == await client.series()
+
+
+@pytest.mark.asyncio
+async def test_iter_series_stop(aresponses, monkeypatch):
+    """Test iter_series method closes the response when stopped early."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("series.json"),
+        ),
+    )
+
+    closed = []
+    close = ClientResponse.close
+
+    def spy(response: ClientResponse) -> None:
+        closed.append(response)
+        close(response)
+
+    monkeypatch.setattr(ClientResponse, "close", spy)
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        series = client.iter_series()
+        async for item in series:
+            break
+
+        await series.aclose()
+        assert len(closed) == 1
+        assert closed[0].closed
+
+
+@pytest.mark.asyncio
+async def test_iter_series_not_json(aresponses):
+    """Test iter_series method with a non JSON response."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(status=200, text="OK"),
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        with pytest.raises(SonarrError):
+            async for _ in client.iter_series():
+                pass
+
+
 @pytest.mark.asyncio
 async def test_update(aresponses):
     """Test update method is handled correctly."""
@@ -224,6 +497,21 @@ async def test_update(aresponses):
         ),
     )
 
+    for fixture, path in (
+        ("system-status.json", "/api/system/status"),
+        ("diskspace.json", "/api/diskspace"),
+    ):
+        aresponses.add(
+            MATCH_HOST,
+            path,
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture(fixture),
+            ),
+        )
+
     async with ClientSession() as session:
         client = Sonarr(HOST, API_KEY, session=session)
         response = await client.update()
@@ -238,6 +526,100 @@ async def test_update(aresponses):
         assert isinstance(response.info, models.Info)
         assert isinstance(response.disks, List)
 
+        # Without disk history, full updates return a new Application.
+        assert await client.update(full_update=True) is not response
+
+
+@pytest.mark.asyncio
+async def test_update_disk_history(aresponses):
+    """Test updates record disk space history in the same Application."""
+    for fixture, path in (
+        ("system-status.json", "/api/system/status"),
+        ("diskspace.json", "/api/diskspace"),
+        ("diskspace.json", "/api/diskspace"),
+        ("system-status.json", "/api/system/status"),
+        ("diskspace.json", "/api/diskspace"),
+    ):
+        aresponses.add(
+            MATCH_HOST,
+            path,
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture(fixture),
+            ),
+        )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session, disk_history=10)
+        app = await client.update()
+        await client.update()
+
+        assert await client.update(full_update=True) is app
+
+    assert len(app.history["C:\\"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_update_concurrent(aresponses):
+    """Test update method requests application sections concurrently."""
+
+    def delayed(fixture):
+        async def handler(request):
+            await asyncio.sleep(0.2)
+            return aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture(fixture),
+            )
+
+        return handler
+
+    aresponses.add(
+        MATCH_HOST, "/api/system/status", "GET", delayed("system-status.json")
+    )
+    aresponses.add(MATCH_HOST, "/api/diskspace", "GET", delayed("diskspace.json"))
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+
+        start = time.monotonic()
+        response = await client.update()
+        elapsed = time.monotonic() - start
+
+        assert isinstance(response.info, models.Info)
+        assert len(response.disks) == 1
+        assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_update_error(aresponses):
+    """Test update method raises errors from concurrent requests."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/system/status",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("system-status.json"),
+        ),
+    )
+    aresponses.add(
+        MATCH_HOST,
+        "/api/diskspace",
+        "GET",
+        aresponses.Response(text="Internal Server Error", status=500),
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        with pytest.raises(SonarrError):
+            await client.update()
+
+        assert client.app is None
+
 
 @pytest.mark.asyncio
 async def test_wanted(aresponses):
@@ -273,3 +655,136 @@ async def test_wanted(aresponses):
 
         assert response.episodes[0]
         assert isinstance(response.episodes[0], models.Episode)
+
+
+@pytest.mark.asyncio
+async def test_wanted_lazy(aresponses):
+    """Test wanted method is handled correctly in lazy mode."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/wanted/missing?sortKey=airDateUtc&page=1&pageSize=10&sortDir=desc",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("wanted-missing.json"),
+        ),
+        match_querystring=True,
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = await client.wanted(lazy=True)
+
+        assert response
+        assert response.total == 2
+        assert len(response.episodes) == 2
+        assert isinstance(response.episodes[0], models.LazyEpisode)
+        assert isinstance(response.episodes[0].materialize(), models.Episode)
+
+
+@pytest.mark.asyncio
+async def test_iter_wanted(aresponses):
+    """Test iter_wanted method fetches all pages."""
+    wanted = json.loads(load_fixture("wanted-missing.json"))
+
+    for page, record in enumerate(wanted["records"], 1):
+        aresponses.add(
+            MATCH_HOST,
+            f"/api/wanted/missing?sortKey=airDateUtc&page={page}"
+            "&pageSize=1&sortDir=desc",
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=json.dumps(
+                    {**wanted, "page": page, "pageSize": 1, "records": [record]}
+                ),
+            ),
+            match_querystring=True,
+        )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        response = [episode async for episode in client.iter_wanted(page_size=1)]
+
+        assert len(response) == 2
+        assert [episode.episode_id for episode in response] == [
+            record["id"] for record in wanted["records"]
+        ]
+
+
+@pytest.mark.asyncio
+async def test_iter_wanted_stop(aresponses):
+    """Test iter_wanted method prefetches pages and stops when closed early."""
+    wanted = json.loads(load_fixture("wanted-missing.json"))
+
+    for page in range(1, 4):
+        aresponses.add(
+            MATCH_HOST,
+            f"/api/wanted/missing?sortKey=airDateUtc&page={page}"
+            "&pageSize=1&sortDir=desc",
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=json.dumps(
+                    {
+                        **wanted,
+                        "page": page,
+                        "pageSize": 1,
+                        "totalRecords": 3,
+                        "records": wanted["records"][:1],
+                    }
+                ),
+            ),
+            match_querystring=True,
+        )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        wanted_page = client.wanted
+        started = []
+        finished = []
+
+        async def wanted_slowly(sort_key, page, page_size, sort_dir):
+            started.append(page)
+            try:
+                if page == 3:
+                    await asyncio.sleep(1)
+                return await wanted_page(sort_key, page, page_size, sort_dir)
+            finally:
+                finished.append(page)
+
+        client.wanted = wanted_slowly
+        episodes = client.iter_wanted(page_size=1)
+        await episodes.__anext__()
+        await asyncio.sleep(0)
+        assert started == [1, 2, 3]
+
+        await episodes.__anext__()
+        assert finished == [1, 2]
+
+        await episodes.aclose()
+        assert sorted(finished) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_iter_wanted_concurrency(aresponses):
+    """Test iter_wanted method rejects a concurrency below one."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/wanted/missing",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("wanted-missing.json"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        with pytest.raises(SonarrError):
+            async for _ in client.iter_wanted(page_size=1, concurrency=0):
+                pass
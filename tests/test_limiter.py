@@ -0,0 +1,219 @@
+"""Tests for Sonarr client-side limiting."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import ClientSession
+from sonarr import RequestLimiter, RetryPolicy, Sonarr
+from sonarr.limiter import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, TokenBucket
+
+from . import load_fixture
+
+API_KEY = "MOCK_API_KEY"
+HOST = "192.168.1.89"
+PORT = 8989
+
+MATCH_HOST = f"{HOST}:{PORT}"
+
+
+def test_token_bucket() -> None:
+    """Test tokens are consumed and refilled at the configured rate."""
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.wait_time() == 0
+    bucket.consume()
+    bucket.consume()
+    assert 0.05 < bucket.wait_time() <= 0.1
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency() -> None:
+    """Test no more than max_concurrency requests run at once."""
+    limiter = RequestLimiter(max_concurrency=2)
+    running = []
+    peak = 0
+
+    async def request() -> None:
+        nonlocal peak
+        async with limiter.limit("series"):
+            running.append(None)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_rate() -> None:
+    """Test requests are spread out by the token bucket."""
+    limiter = RequestLimiter(rate=20, burst=1)
+
+    start = time.monotonic()
+    for _ in range(3):
+        async with limiter.limit("series"):
+            pass
+
+    assert time.monotonic() - start >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_endpoint_rate() -> None:
+    """Test per-endpoint rates only apply to their endpoint."""
+    limiter = RequestLimiter(endpoint_rates={"series": (1, 1)})
+
+    async with limiter.limit("series"):
+        pass
+
+    start = time.monotonic()
+    async with limiter.limit("command/12"):
+        pass
+    assert time.monotonic() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_endpoint_rate_skipped() -> None:
+    """Test requests waiting for their endpoint do not hold back others."""
+    limiter = RequestLimiter(endpoint_rates={"calendar": (0.5, 1)})
+
+    async with limiter.limit("calendar"):
+        pass
+
+    calendar = asyncio.ensure_future(limiter.acquire("calendar"))
+    await asyncio.sleep(0)
+
+    start = time.monotonic()
+    await asyncio.wait_for(limiter.acquire("queue"), 1)
+    assert time.monotonic() - start < 0.5
+    assert not calendar.done()
+
+    calendar.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await calendar
+
+
+@pytest.mark.asyncio
+async def test_priority() -> None:
+    """Test interactive requests jump ahead of queued background requests."""
+    limiter = RequestLimiter(max_concurrency=1)
+    order = []
+
+    async def request(name: str, priority: int) -> None:
+        async with limiter.limit("series", priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    await limiter.acquire("series")
+    tasks = [
+        asyncio.ensure_future(request("background", PRIORITY_BACKGROUND)),
+        asyncio.ensure_future(request("interactive", PRIORITY_INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    limiter.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter() -> None:
+    """Test cancelled waiters do not hold a slot."""
+    limiter = RequestLimiter(max_concurrency=1)
+
+    await limiter.acquire("series")
+    waiter = asyncio.ensure_future(limiter.acquire("series"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    limiter.release()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    await asyncio.wait_for(limiter.acquire("series"), 1)
+    assert limiter.active == 1
+
+
+@pytest.mark.asyncio
+async def test_client_limiter(aresponses):
+    """Test the client holds a slot for each request."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("series.json"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        limiter = RequestLimiter(max_concurrency=1)
+        client = Sonarr(HOST, API_KEY, session=session, limiter=limiter)
+
+        assert await client.series()
+        assert limiter.active == 0
+
+
+@pytest.mark.asyncio
+async def test_client_limiter_stream(aresponses):
+    """Test the client releases the slot once a streamed response arrives."""
+    for path in ("/api/series", "/api/queue"):
+        aresponses.add(
+            MATCH_HOST,
+            path,
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture(path[5:] + ".json"),
+            ),
+        )
+
+    async with ClientSession() as session:
+        limiter = RequestLimiter(max_concurrency=1)
+        client = Sonarr(HOST, API_KEY, session=session, limiter=limiter)
+
+        async for _ in client.iter_series():
+            assert limiter.active == 0
+            assert await asyncio.wait_for(client.queue(), 1)
+            break
+
+
+@pytest.mark.asyncio
+async def test_client_limiter_retry(aresponses):
+    """Test the client releases the slot while waiting to retry."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=503, headers={"Retry-After": "0.2"}, text="Unavailable"
+        ),
+    )
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("series.json"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        limiter = RequestLimiter(max_concurrency=1)
+        client = Sonarr(
+            HOST, API_KEY, session=session, limiter=limiter, retry=RetryPolicy()
+        )
+
+        task = asyncio.ensure_future(client.series())
+        await asyncio.sleep(0.1)
+        assert limiter.active == 0
+
+        assert await task
+        assert limiter.active == 0
@@ -0,0 +1,155 @@
+"""Tests for Sonarr request instrumentation."""
+import pytest
+from aiohttp import ClientSession
+from sonarr import MetricsCollector, RequestObserver, Sonarr, SonarrError
+from sonarr.metrics import Histogram, RequestMetrics, endpoint_name
+
+from . import load_fixture
+
+API_KEY = "MOCK_API_KEY"
+HOST = "192.168.1.89"
+PORT = 8989
+
+MATCH_HOST = f"{HOST}:{PORT}"
+
+
+class RecordingObserver(RequestObserver):
+    """Observer recording all metrics."""
+
+    def __init__(self) -> None:
+        """Initialize observer."""
+        self.requests = []
+        self.parses = []
+
+    def request_finished(self, metrics) -> None:
+        """Record request metrics."""
+        self.requests.append(metrics)
+
+    def models_parsed(self, metrics) -> None:
+        """Record parse metrics."""
+        self.parses.append(metrics)
+
+
+def test_endpoint_name() -> None:
+    """Test numeric ids are removed from endpoint names."""
+    assert endpoint_name("command/368621") == "command/{id}"
+    assert endpoint_name("series/5/episodes?x=1") == "series/{id}/episodes"
+    assert endpoint_name("system/status") == "system/status"
+
+
+def test_histogram() -> None:
+    """Test histogram buckets are cumulative."""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+
+
+def test_collector_prometheus() -> None:
+    """Test collected metrics are exported in the Prometheus text format."""
+    collector = MetricsCollector(buckets=(1.0,))
+    collector.request_finished(
+        RequestMetrics(
+            method="GET",
+            endpoint="series",
+            status=200,
+            total=0.5,
+            ttfb=0.2,
+            size=10,
+            transferred=4,
+            encoding="gzip",
+        )
+    )
+    collector.request_finished(
+        RequestMetrics(method="GET", endpoint="series", status=None, total=2.0)
+    )
+
+    output = collector.to_prometheus()
+
+    assert "# TYPE sonarr_request_duration_seconds histogram" in output
+    assert (
+        'sonarr_request_duration_seconds_bucket{endpoint="series",phase="total",'
+        'le="1.0"} 1' in output
+    )
+    assert (
+        'sonarr_request_duration_seconds_count{endpoint="series",phase="ttfb"} 1'
+        in output
+    )
+    assert 'sonarr_requests_total{endpoint="series",status="200"} 1' in output
+    assert 'sonarr_requests_total{endpoint="series",status="error"} 1' in output
+    assert 'sonarr_response_bytes_total{endpoint="series"} 10' in output
+    assert (
+        'sonarr_response_transferred_bytes_total{endpoint="series",encoding="gzip"} 4'
+        in output
+    )
+
+
+@pytest.mark.asyncio
+async def test_observers(aresponses):
+    """Test observers receive request and parse metrics."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("series.json"),
+        ),
+    )
+    aresponses.add(
+        MATCH_HOST,
+        "/api/command/1",
+        "GET",
+        aresponses.Response(text="Internal Server Error", status=500),
+    )
+
+    observer = RecordingObserver()
+    collector = MetricsCollector()
+
+    async with Sonarr(HOST, API_KEY, observers=[observer, collector]) as client:
+        series = await client.series()
+
+        with pytest.raises(SonarrError):
+            await client.command_status(1)
+
+    success, failure = observer.requests
+
+    assert success.endpoint == "series"
+    assert success.status == 200
+    assert success.size == len(load_fixture("series.json").encode("utf-8"))
+    assert success.read is not None
+    assert success.decode is not None
+    assert success.total >= success.ttfb
+
+    assert failure.endpoint == "command/{id}"
+    assert failure.status == 500
+
+    assert len(observer.parses) == 1
+    assert observer.parses[0].endpoint == "series"
+    assert observer.parses[0].count == len(series)
+
+    assert 'sonarr_models_parsed_total{endpoint="series"}' in collector.to_prometheus()
+
+
+@pytest.mark.asyncio
+async def test_no_observers(aresponses):
+    """Test requests are not traced without observers."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("series.json"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        assert client._trace("GET", "series") is None
+        assert await client.series()
@@ -0,0 +1,202 @@
+"""Tests for Sonarr library mirroring."""
+import asyncio
+import copy
+import json
+import sqlite3
+
+import pytest
+from aiohttp import ClientSession
+from sonarr import LibraryMirror, Sonarr
+from sonarr.models import LazySeriesItem, SeriesItem
+
+from . import load_fixture
+
+API_KEY = "MOCK_API_KEY"
+HOST = "192.168.1.89"
+PORT = 8989
+
+MATCH_HOST = f"{HOST}:{PORT}"
+
+SERIES = json.loads(load_fixture("series.json"))
+
+
+def add_library(aresponses, series):
+    """Add responses for a full library refresh."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=json.dumps(series),
+        ),
+    )
+
+    for path, fixture in (
+        ("/api/system/status", "system-status.json"),
+        ("/api/diskspace", "diskspace.json"),
+    ):
+        aresponses.add(
+            MATCH_HOST,
+            path,
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture(fixture),
+            ),
+        )
+
+
+@pytest.mark.asyncio
+async def test_load_empty(tmp_path):
+    """Test loading a new mirror file."""
+    mirror = LibraryMirror(Sonarr(HOST, API_KEY), str(tmp_path / "sonarr.db"))
+
+    assert not await mirror.load()
+    assert mirror.series() == []
+    assert mirror.app is None
+    assert mirror.synced is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_and_load(aresponses, tmp_path):
+    """Test refreshed data is served after a restart without requests."""
+    path = str(tmp_path / "sonarr.db")
+    add_library(aresponses, SERIES)
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session)
+        mirror = LibraryMirror(client, path)
+        await mirror.refresh()
+
+        assert mirror.synced is not None
+        assert client.app is mirror.app
+        assert mirror.app.info.version == "2.0.0.1121"
+        series = mirror.series()
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    client = Sonarr(HOST, API_KEY)
+    restored = LibraryMirror(client, path)
+    assert await restored.load()
+
+    assert restored.synced == mirror.synced
+    assert restored.series() == series
+    assert all(isinstance(item, SeriesItem) for item in series)
+    assert restored.app.info == mirror.app.info
+    assert restored.app.disks == mirror.app.disks
+    assert client.app is restored.app
+
+    lazy = restored.series(lazy=True)
+    assert isinstance(lazy[0], LazySeriesItem)
+    assert lazy[0].series.title == series[0].series.title
+
+
+@pytest.mark.asyncio
+async def test_refresh_changes(aresponses, tmp_path):
+    """Test refreshes store changed and removed series."""
+    path = str(tmp_path / "sonarr.db")
+    data = copy.deepcopy(SERIES[:1])
+    data[0]["title"] = "Mayberry R.F.D."
+    add_library(aresponses, SERIES)
+    add_library(aresponses, data)
+
+    async with ClientSession() as session:
+        mirror = LibraryMirror(Sonarr(HOST, API_KEY, session=session), path)
+        await mirror.refresh()
+        first = mirror.series()
+        await mirror.refresh()
+
+    assert len(first) == len(SERIES)
+    assert [item.series.title for item in mirror.series()] == ["Mayberry R.F.D."]
+
+    restored = LibraryMirror(Sonarr(HOST, API_KEY), path)
+    await restored.load()
+    assert restored.series() == mirror.series()
+
+
+@pytest.mark.asyncio
+async def test_background_refresh(aresponses, tmp_path):
+    """Test mirrored data is served while refreshing in the background."""
+    path = str(tmp_path / "sonarr.db")
+    add_library(aresponses, SERIES)
+
+    async with ClientSession() as session:
+        mirror = LibraryMirror(Sonarr(HOST, API_KEY, session=session), path)
+        await mirror.refresh()
+
+        # The next refresh fails, keeping the mirrored data.
+        aresponses.add(
+            MATCH_HOST,
+            "/api/series",
+            "GET",
+            aresponses.Response(text="Internal Server Error", status=500),
+        )
+
+        client = Sonarr(HOST, API_KEY, session=session)
+        async with LibraryMirror(client, path, refresh_interval=60) as restored:
+            assert len(restored.series()) == len(SERIES)
+            await asyncio.sleep(0.05)
+            assert restored._task is not None
+            assert len(restored.series()) == len(SERIES)
+
+        assert restored._task is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_disk_history(aresponses, tmp_path):
+    """Test refreshes keep the disk history recorded by the client."""
+    for fixture, path in (
+        ("system-status.json", "/api/system/status"),
+        ("diskspace.json", "/api/diskspace"),
+    ):
+        aresponses.add(
+            MATCH_HOST,
+            path,
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture(fixture),
+            ),
+        )
+    add_library(aresponses, SERIES)
+
+    async with ClientSession() as session:
+        client = Sonarr(HOST, API_KEY, session=session, disk_history=10)
+        app = await client.update()
+
+        mirror = LibraryMirror(client, str(tmp_path / "sonarr.db"))
+        await mirror.refresh()
+
+        assert client.app is app
+        assert mirror.app is app
+        assert len(app.history["C:\\"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_errors(tmp_path, caplog, monkeypatch):
+    """Test unexpected refresh errors are logged without stopping refreshes."""
+    mirror = LibraryMirror(
+        Sonarr(HOST, API_KEY), str(tmp_path / "sonarr.db"), refresh_interval=0.01
+    )
+    errors = [sqlite3.OperationalError("database is locked"), ValueError("JSON")]
+
+    async def refresh():
+        if errors:
+            raise errors.pop(0)
+
+    monkeypatch.setattr(mirror, "refresh", refresh)
+
+    mirror.start()
+    await asyncio.sleep(0.1)
+    assert not mirror._task.done()
+    await mirror.stop()
+
+    assert not errors
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 2
+    assert all("Unexpected error refreshing mirror" in text for text in messages)
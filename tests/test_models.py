@@ -1,5 +1,9 @@
 """Tests for Sonarr Models."""
+import copy
 import json
+import pickle
+import weakref
+from dataclasses import FrozenInstanceError
 from datetime import datetime, timezone
 from typing import List
 
@@ -40,6 +44,33 @@ def test_application_no_data() -> None:
         models.Application({})
 
 
+def test_slotted() -> None:
+    """Test the models are slotted, immutable and comparable."""
+    item = models.SeriesItem.from_dict(SERIES[0])
+
+    assert not hasattr(item, "__dict__")
+    assert not hasattr(item.series, "__dict__")
+    assert not hasattr(item.seasons[0], "__dict__")
+
+    with pytest.raises(FrozenInstanceError):
+        item.series.title = "Mayberry R.F.D."
+
+    with pytest.raises(FrozenInstanceError):
+        item.series.unknown = True
+
+    with pytest.raises(FrozenInstanceError):
+        del item.series.title
+
+    with pytest.raises(FrozenInstanceError):
+        models.Disk.from_dict({}).foo = 1
+
+    assert item == models.SeriesItem.from_dict(SERIES[0])
+    assert pickle.loads(pickle.dumps(item)) == item
+    assert copy.deepcopy(item) == item
+    assert hash(item.seasons[0]) == hash(copy.copy(item.seasons[0]))
+    assert weakref.ref(item.series)() is item.series
+
+
 def test_dt_str_to_dt() -> None:
     """Test the dt_str_to_dt method."""
     dt = models.dt_str_to_dt("2018-05-14T19:02:13.101496Z")
@@ -52,6 +83,63 @@ def test_dt_str_to_dt_long_microseconds() -> None:
     assert dt == datetime(2018, 5, 14, 19, 2, 13, 100000, tzinfo=timezone.utc)
 
 
+def test_dt_str_to_dt_no_timezone() -> None:
+    """Test the dt_str_to_dt method without a UTC suffix."""
+    dt = models.dt_str_to_dt("2018-05-14T19:02:13")
+    assert dt == datetime(2018, 5, 14, 19, 2, 13)
+    assert dt.tzinfo is None
+
+
+def test_dt_str_to_dt_matches_strptime() -> None:
+    """Test the dt_str_to_dt fast path matches the strptime path."""
+    for dt_str in [
+        "2014-02-08T20:49:36.5560392Z",
+        "2020-04-06T16:54:06.41945Z",
+        "2020-04-06T16:54:06.4Z",
+        "1960-02-15T06:00:00Z",
+        "2018-05-14T19:02:13.101496",
+        "2018-05-14T19:02:13",
+    ]:
+        expected = models._dt_str_to_dt_strptime(dt_str)
+        dt = models._dt_str_to_dt_fast(dt_str)
+        assert dt == expected
+        assert dt.tzinfo == expected.tzinfo
+
+
+def test_dt_str_to_dt_invalid() -> None:
+    """Test the dt_str_to_dt method with an invalid value."""
+    with pytest.raises(ValueError):
+        models.dt_str_to_dt("2018-05-14")
+
+    with pytest.raises(ValueError):
+        models.dt_str_to_dt("2018-05-14T19:02:13.abcZ")
+
+
+def test_dt_str_to_dt_cached() -> None:
+    """Test the dt_str_to_dt method reuses parsed values."""
+    dt = models.dt_str_to_dt("2019-07-01T12:00:00.123Z")
+    assert models.dt_str_to_dt("2019-07-01T12:00:00.123Z") is dt
+
+
+def test_intern_series() -> None:
+    """Test the intern_series method shares Series objects by id."""
+    series_cache = {}
+    data = CALENDAR[0]["series"]
+
+    series = models.intern_series(data, series_cache)
+    assert series == models.Series.from_dict(data)
+    assert models.intern_series(dict(data), series_cache) is series
+    assert models.intern_series(data) is not series
+    assert models.intern_series({}, series_cache) is not models.intern_series(
+        {}, series_cache
+    )
+
+    first = models.Episode.from_dict(CALENDAR[0], series_cache)
+    second = models.Episode.from_dict(dict(CALENDAR[0]), series_cache)
+    assert first.series is series
+    assert second.series is series
+
+
 def test_info() -> None:
     """Test the Info model."""
     info = models.Info.from_dict(INFO)
@@ -128,6 +216,7 @@ def test_disk() -> None:
 def test_queue_item() -> None:
     """Test the QueueItem model."""
     item = models.QueueItem.from_dict(QUEUE[0])
+    assert "series" not in QUEUE[0]["episode"]
 
     assert item.queue_id == 1503378561
     assert item.download_id == "SABnzbd_nzo_Mq2f_b"
@@ -259,6 +348,45 @@ crime-free."""
     assert item.seasons[3].diskspace == 8000000000
 
 
+def test_lazy_series_item() -> None:
+    """Test the LazySeriesItem proxy."""
+    item = models.LazySeriesItem(SERIES[0])
+
+    assert item.series.title == "The Andy Griffith Show"
+    assert item.series.monitored
+    assert "added" not in item.series._cache
+    assert "seasons" not in item._cache
+
+    assert item.total_episodes == 253
+    assert item.seasons is item.seasons
+    assert isinstance(item.seasons[3], models.Season)
+
+    assert item.materialize() == models.SeriesItem.from_dict(SERIES[0])
+
+    with pytest.raises(AttributeError):
+        item.unknown
+
+
+def test_lazy_copy() -> None:
+    """Test the lazy proxies can be copied and pickled."""
+    item = models.LazySeriesItem(SERIES[0])
+    assert item.series.title == "The Andy Griffith Show"
+
+    expected = models.SeriesItem.from_dict(SERIES[0])
+    assert copy.copy(item).materialize() == expected
+    assert copy.deepcopy(item).materialize() == expected
+    assert pickle.loads(pickle.dumps(item)).materialize() == expected
+
+
+def test_lazy_episode() -> None:
+    """Test the LazyEpisode proxy."""
+    episode = models.LazyEpisode(WANTED["records"][0])
+
+    assert episode.identifier == "S04E11"
+    assert isinstance(episode.series, models.LazySeries)
+    assert episode.materialize() == models.Episode.from_dict(WANTED["records"][0])
+
+
 def test_wanted_results() -> None:
     """Test the WantedResults model."""
     results = models.WantedResults.from_dict(WANTED)
@@ -0,0 +1,66 @@
+"""Tests for Sonarr retry policy and circuit breaker."""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from sonarr.retry import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+def test_parse_retry_after() -> None:
+    """Test Retry-After headers in seconds and HTTP date format."""
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("-1") == 0
+    assert parse_retry_after("soon") is None
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(
+        30, abs=2
+    )
+
+
+def test_delay() -> None:
+    """Test backoff delays grow exponentially within the jitter range."""
+    policy = RetryPolicy(attempts=4, backoff=1, max_backoff=3, jitter=0.5)
+
+    assert 0.5 <= policy.delay(1) <= 1
+    assert 1 <= policy.delay(2) <= 2
+    assert 1.5 <= policy.delay(3) <= 3
+    assert policy.delay(4) is None
+
+
+def test_delay_retry_after() -> None:
+    """Test Retry-After is honoured up to the maximum backoff."""
+    policy = RetryPolicy(max_backoff=10)
+
+    assert policy.delay(1, "5") == 5
+    assert policy.delay(1, "60") is None
+
+
+def test_circuit_breaker(monkeypatch) -> None:
+    """Test the circuit opens, lets a trial through and closes again."""
+    now = [100.0]
+    monkeypatch.setattr("sonarr.retry.monotonic", lambda: now[0])
+
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+    assert breaker.failures == 0
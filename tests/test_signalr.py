@@ -0,0 +1,219 @@
+"""Tests for Sonarr SignalR subscriptions."""
+import asyncio
+import json
+
+import pytest
+import sonarr.client
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestServer
+from sonarr import Sonarr, SonarrAccessRestricted, SonarrConnectionError
+from sonarr.models import CommandItem, Event, QueueItem
+from sonarr.signalr import decode_messages, encode_message
+
+from . import load_fixture
+
+API_KEY = "MOCK_API_KEY"
+HOST = "127.0.0.1"
+
+
+def invocation(name, body):
+    """Return a framed SignalR invocation of receiveMessage."""
+    return encode_message(
+        {
+            "type": 1,
+            "target": "receiveMessage",
+            "arguments": [{"name": name, "body": body}],
+        }
+    )
+
+
+class Hub:
+    """Stand-in SignalR hub serving frames to each connection."""
+
+    def __init__(self, connections, handshake=encode_message({})):
+        """Initialize hub with the frames to send per connection.
+
+        The last connection is kept open until closed by the client.
+        """
+        self.connections = list(connections)
+        self.handshake = handshake
+        self.handshakes = []
+        self.received = []
+        self.tokens = []
+
+    async def handler(self, request):
+        """Handle a websocket connection."""
+        self.tokens.append(request.query.get("access_token"))
+        if request.query.get("access_token") != API_KEY:
+            raise web.HTTPUnauthorized()
+
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+
+        message = await websocket.receive()
+        self.handshakes.append(decode_messages(message.data)[0])
+        await websocket.send_str(self.handshake)
+
+        frames = self.connections.pop(0) if self.connections else []
+        for frame in frames:
+            await websocket.send_str(frame)
+
+        if not self.connections:
+            async for message in websocket:
+                if message.type == WSMsgType.TEXT:
+                    self.received.extend(decode_messages(message.data))
+
+        await websocket.close()
+        return websocket
+
+    def app(self):
+        """Return the hub web application."""
+        app = web.Application()
+        app.router.add_get("/signalr/messages", self.handler)
+        return app
+
+
+def test_framing() -> None:
+    """Test SignalR frames holding several messages are decoded."""
+    frame = encode_message({"type": 6}) + encode_message({"type": 7})
+    assert frame == '{"type":6}\x1e{"type":7}\x1e'
+    assert decode_messages(frame) == [{"type": 6}, {"type": 7}]
+
+
+def test_event_from_dict() -> None:
+    """Test event resources are decoded into models."""
+    command = json.loads(load_fixture("command-id.json"))
+    event = Event.from_dict(
+        {"name": "command", "body": {"action": "updated", "resource": command}}
+    )
+    assert event.name == "command"
+    assert event.action == "updated"
+    assert isinstance(event.resource, CommandItem)
+
+    event = Event.from_dict({"name": "queue", "body": {"action": "sync"}})
+    assert event.action == "sync"
+    assert event.resource is None
+
+    event = Event.from_dict(
+        {"name": "health", "body": {"action": "sync", "resource": {"a": 1}}}
+    )
+    assert event.resource == {"a": 1}
+
+
+@pytest.mark.asyncio
+async def test_subscribe() -> None:
+    """Test pushed events are decoded and filtered."""
+    queue = json.loads(load_fixture("queue.json"))[0]
+    updated = invocation("queue", {"action": "updated", "resource": queue})
+    synced = invocation("queue", {"action": "sync"})
+    # Filtered out events are not decoded, so a broken resource is ignored.
+    broken = invocation("series", {"action": "updated", "resource": {"seasons": [1]}})
+    hub = Hub([[invocation("health", {"action": "sync"}), broken, updated + synced]])
+
+    async with TestServer(hub.app()) as server:
+        async with Sonarr(HOST, API_KEY, port=server.port) as client:
+            events = client.subscribe(events=["queue"])
+            first = await events.__anext__()
+            second = await events.__anext__()
+            await events.aclose()
+
+    assert hub.tokens == [API_KEY]
+    assert hub.handshakes == [{"protocol": "json", "version": 1}]
+    assert first.name == "queue"
+    assert isinstance(first.resource, QueueItem)
+    assert first.resource.queue_id == queue["id"]
+    assert second.action == "sync"
+    assert second.resource is None
+
+
+@pytest.mark.asyncio
+async def test_subscribe_reconnect() -> None:
+    """Test the subscription reconnects when the hub closes the connection."""
+    hub = Hub(
+        [
+            [invocation("series", {"action": "deleted"}), encode_message({"type": 7})],
+            [invocation("episode", {"action": "updated"})],
+        ]
+    )
+
+    async with TestServer(hub.app()) as server:
+        async with Sonarr(HOST, API_KEY, port=server.port) as client:
+            events = client.subscribe(backoff=0.01)
+            first = await events.__anext__()
+            second = await asyncio.wait_for(events.__anext__(), 2)
+            await events.aclose()
+
+    assert (first.name, second.name) == ("series", "episode")
+    assert len(hub.handshakes) == 2
+
+
+@pytest.mark.asyncio
+async def test_subscribe_malformed_messages() -> None:
+    """Test malformed messages are skipped or reconnect the subscription."""
+    eta = {"estimatedCompletionTime": "soon"}
+    hub = Hub(
+        [
+            [
+                encode_message({"type": 1, "arguments": ["health", None]}),
+                encode_message({"type": 1, "arguments": 1}) + "[1]\x1e",
+                invocation("queue", {"action": "updated", "resource": [1]}),
+                invocation("queue", {"action": "updated", "resource": eta}),
+                invocation("series", {"action": "deleted"}),
+                "{\x1e",
+            ],
+            [invocation("episode", {"action": "updated"})],
+        ]
+    )
+
+    async with TestServer(hub.app()) as server:
+        async with Sonarr(HOST, API_KEY, port=server.port) as client:
+            events = client.subscribe(backoff=0.01)
+            first = await asyncio.wait_for(events.__anext__(), 2)
+            second = await asyncio.wait_for(events.__anext__(), 2)
+            await events.aclose()
+
+    assert (first.name, second.name) == ("series", "episode")
+    assert len(hub.handshakes) == 2
+
+
+@pytest.mark.asyncio
+async def test_subscribe_ping(monkeypatch) -> None:
+    """Test pings are sent to keep the connection alive."""
+    monkeypatch.setattr(sonarr.client, "PING_INTERVAL", 0.01)
+    hub = Hub([[]])
+
+    async with TestServer(hub.app()) as server:
+        async with Sonarr(HOST, API_KEY, port=server.port) as client:
+            events = client.subscribe()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(events.__anext__(), 0.1)
+
+    assert {"type": 6} in hub.received
+
+
+@pytest.mark.asyncio
+async def test_subscribe_access_restricted() -> None:
+    """Test an invalid API key is raised instead of reconnecting."""
+    hub = Hub([])
+
+    async with TestServer(hub.app()) as server:
+        async with Sonarr(HOST, "INVALID", port=server.port) as client:
+            with pytest.raises(SonarrAccessRestricted):
+                await client.subscribe().__anext__()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_malformed_handshake() -> None:
+    """Test a malformed handshake response is a connection error."""
+    hub = Hub([[]], handshake="{\x1e")
+
+    async with TestServer(hub.app()) as server:
+        async with Sonarr(HOST, API_KEY, port=server.port) as client:
+            with pytest.raises(SonarrConnectionError):
+                await client._connect_hub()
+
+            events = client.subscribe(backoff=0.01)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(events.__anext__(), 0.2)
+
+    assert len(hub.handshakes) > 2
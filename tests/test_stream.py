@@ -0,0 +1,86 @@
+"""Tests for Sonarr incremental JSON decoding."""
+import json
+
+import pytest
+from sonarr import SonarrError
+from sonarr.stream import JSONArrayDecoder
+
+from . import load_fixture
+
+
+def decode(payload: bytes, chunk_size: int) -> list:
+    """Decode payload split into chunks of chunk_size bytes."""
+    decoder = JSONArrayDecoder()
+    items = []
+
+    for start in range(0, len(payload), chunk_size):
+        end = start + chunk_size
+        items.extend(decoder.feed(payload[start:end]))
+
+    decoder.close()
+    return items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 65536])
+def test_decode_chunks(chunk_size: int) -> None:
+    """Test array elements are decoded regardless of chunk boundaries."""
+    payload = load_fixture("series.json").encode("utf-8")
+    assert decode(payload, chunk_size) == json.loads(payload)
+
+
+def test_decode_scalars() -> None:
+    """Test scalars and nested values are decoded."""
+    payload = ' [ 12 , "ü", {"a": [1, 2]}, true,null ] '.encode("utf-8")
+    assert decode(payload, 1) == [12, "ü", {"a": [1, 2]}, True, None]
+
+
+def test_decode_empty() -> None:
+    """Test an empty array is decoded."""
+    assert decode(b"[]", 1) == []
+
+
+def test_decode_not_array() -> None:
+    """Test a non-array payload raises an error."""
+    with pytest.raises(SonarrError):
+        JSONArrayDecoder().feed(b'{"records": []}')
+
+
+def test_decode_malformed() -> None:
+    """Test a malformed array raises an error."""
+    with pytest.raises(SonarrError):
+        JSONArrayDecoder().feed(b"[1 2]")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64])
+def test_decode_trailing_data(chunk_size: int) -> None:
+    """Test data after the closing bracket raises an error."""
+    assert decode(b"[1] \n", chunk_size) == [1]
+
+    with pytest.raises(SonarrError):
+        decode(b"[1]junk", chunk_size)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b'[{"id": tru}', b'[{"id": 1.}', b'[{"id" 1', b'[{"id": "\\uzz', b"[{]"],
+)
+def test_decode_malformed_element(payload: bytes) -> None:
+    """Test a malformed element raises an error before the array ends."""
+    with pytest.raises(SonarrError):
+        JSONArrayDecoder().feed(payload)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2])
+def test_decode_numbers(chunk_size: int) -> None:
+    """Test numbers split within their fraction or exponent are decoded."""
+    payload = b'[1.5e-3, -2.0E+2, {"id": 10.25}]'
+    assert decode(payload, chunk_size) == [0.0015, -200.0, {"id": 10.25}]
+
+
+def test_decode_incomplete() -> None:
+    """Test a truncated array raises an error on close."""
+    decoder = JSONArrayDecoder()
+    assert decoder.feed(b'[{"id": 1}, {"id"') == [{"id": 1}]
+
+    with pytest.raises(SonarrError):
+        decoder.close()
@@ -0,0 +1,180 @@
+"""Tests for Sonarr change tracking."""
+import copy
+import json
+from dataclasses import replace
+
+import pytest
+from aiohttp import ClientSession
+from sonarr import QueueWatcher, SeriesTracker, Sonarr, SonarrConnectionError
+from sonarr.models import QueueItem, SeriesItem
+from sonarr.tracker import changed_fields
+
+from . import load_fixture
+
+API_KEY = "MOCK_API_KEY"
+HOST = "192.168.1.89"
+PORT = 8989
+
+MATCH_HOST = f"{HOST}:{PORT}"
+
+QUEUE = json.loads(load_fixture("queue.json"))
+SERIES = json.loads(load_fixture("series.json"))
+
+
+def test_changed_fields() -> None:
+    """Test changed fields are reported with dotted names."""
+    data = copy.deepcopy(SERIES[0])
+    data["title"] = "Mayberry R.F.D."
+    data["sizeOnDisk"] = 1
+
+    old = SeriesItem.from_dict(SERIES[0])
+    new = SeriesItem.from_dict(data)
+
+    assert changed_fields(old, new) == ("series.title", "diskspace")
+    assert changed_fields(old, old) == ()
+
+
+def test_update_from_list() -> None:
+    """Test snapshot updates report added, removed and changed series."""
+    tracker = SeriesTracker(Sonarr(HOST, API_KEY))
+
+    changes = tracker.update_from_list(SERIES)
+    assert len(changes.added) == len(SERIES)
+    assert not changes.removed
+    assert not changes.changed
+
+    assert not tracker.update_from_list(copy.deepcopy(SERIES))
+
+    data = copy.deepcopy(SERIES[:1])
+    data[0]["monitored"] = False
+
+    changes = tracker.update_from_list(data)
+    assert not changes.added
+    assert [item.series.series_id for item in changes.removed] == [
+        item["id"] for item in SERIES[1:]
+    ]
+    assert len(changes.changed) == 1
+    assert changes.changed[0].fields == ("series.monitored",)
+    assert changes.changed[0].item is tracker.series[SERIES[0]["id"]]
+    assert list(tracker.series) == [SERIES[0]["id"]]
+
+
+@pytest.mark.asyncio
+async def test_refresh(aresponses):
+    """Test refresh method is handled correctly."""
+    aresponses.add(
+        MATCH_HOST,
+        "/api/series",
+        "GET",
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture("series.json"),
+        ),
+    )
+
+    async with ClientSession() as session:
+        tracker = SeriesTracker(Sonarr(HOST, API_KEY, session=session))
+        changes = await tracker.refresh()
+
+        assert len(changes.added) == len(SERIES)
+        assert len(tracker.series) == len(SERIES)
+
+
+def test_queue_watcher() -> None:
+    """Test queue changes, throughput and adaptive polling interval."""
+    watcher = QueueWatcher(
+        Sonarr(HOST, API_KEY), min_interval=1, max_interval=4, backoff=2
+    )
+    item = replace(QueueItem.from_dict(QUEUE[0]), size_remaining=1000)
+
+    changes = watcher.update_from_list([item], 10.0)
+    assert len(changes) == 1
+    assert changes[0].item is item
+    assert changes[0].throughput is None
+    assert watcher.interval == 1
+
+    progressed = replace(item, size_remaining=400)
+    changes = watcher.update_from_list([progressed], 12.0)
+    assert len(changes) == 1
+    assert changes[0].throughput == 300
+
+    assert watcher.update_from_list([progressed], 14.0) == []
+    assert watcher.interval == 1
+
+    completed = replace(progressed, status="Completed", size_remaining=0)
+    watcher.update_from_list([completed], 16.0)
+    assert watcher.interval == 1
+
+    watcher.update_from_list([completed], 17.0)
+    assert watcher.interval == 2
+    watcher.update_from_list([completed], 19.0)
+    assert watcher.interval == 4
+    watcher.update_from_list([completed], 23.0)
+    assert watcher.interval == 4
+
+    changes = watcher.update_from_list([], 27.0)
+    assert len(changes) == 1
+    assert changes[0].removed
+    assert changes[0].item is completed
+    assert watcher.interval == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_watcher_watch(aresponses):
+    """Test watch method polls the queue and yields changes."""
+    for _ in range(2):
+        aresponses.add(
+            MATCH_HOST,
+            "/api/queue",
+            "GET",
+            aresponses.Response(
+                status=200,
+                headers={"Content-Type": "application/json"},
+                text=load_fixture("queue.json"),
+            ),
+        )
+    aresponses.add(
+        MATCH_HOST,
+        "/api/queue",
+        "GET",
+        aresponses.Response(
+            status=200, headers={"Content-Type": "application/json"}, text="[]"
+        ),
+    )
+
+    async with ClientSession() as session:
+        watcher = QueueWatcher(
+            Sonarr(HOST, API_KEY, session=session), min_interval=0.01
+        )
+        changes = []
+
+        async for progress in watcher.watch():
+            changes.append(progress)
+            if len(changes) == 2:
+                break
+
+        assert not changes[0].removed
+        assert changes[1].removed
+        assert changes[0].item == changes[1].item
+
+
+@pytest.mark.asyncio
+async def test_queue_watcher_watch_connection_error() -> None:
+    """Test watch method keeps polling after connection errors."""
+    watcher = QueueWatcher(Sonarr(HOST, API_KEY), min_interval=0.01, max_interval=0.02)
+    polls = []
+
+    async def queue():
+        polls.append(watcher.interval)
+        if len(polls) == 1:
+            raise SonarrConnectionError("Error occurred while connecting to API")
+        return [QueueItem.from_dict(QUEUE[0])]
+
+    watcher.sonarr.queue = queue
+
+    async for progress in watcher.watch():
+        assert progress.item.queue_id == QUEUE[0]["id"]
+        break
+
+    assert polls == [0.01, 0.02]